@@ -1,58 +1,120 @@
-import sqlite3
 import os
-from typing import List, Optional, Tuple
-from src.database import DatabaseManager
-from src.config import DATABASE_PATH
+import sqlite3
+import threading
+import logging
+from typing import Iterator, List, Optional, Tuple
+from src.database import DatabaseManager, RECORD_COLUMNS
+from src.query_cache import QueryCache
+from src.config import DATABASE_PATH, COUNT_CACHE_TTL, EXPORT_CHUNK_SIZE
+
+logger = logging.getLogger(__name__)
 
 class FacultyAPI:
     def __init__(self, db_path: str = DATABASE_PATH):
         self.db = DatabaseManager(db_path)
+        self._recommender = None
+        self._recommender_lock = threading.Lock()
+        self._counts = QueryCache(maxsize=64, ttl=COUNT_CACHE_TTL)
+
+    def get_recommender(self):
+        recommender = self._recommender
+        if recommender is not None and not recommender.is_stale():
+            return recommender
+
+        with self._recommender_lock:
+            recommender = self._recommender
+            if recommender is None or recommender.is_stale():
+                from src.recommender import FacultyRecommender
+                # Build the replacement fully before swapping so in-flight searches keep the old one
+                recommender = FacultyRecommender()
+                self._recommender = recommender
+            return recommender
+
+    def warm_up(self) -> bool:
+        try:
+            # Creates anything missing from older databases (full-text index, neighbor table)
+            self.db.init_db()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not update the database schema: {e}")
+        try:
+            self.get_recommender()
+            return True
+        except Exception as e:
+            logger.warning(f"Recommender unavailable, search will use keyword fallback: {e}")
+            return False
+
+    def get_all(self, page: int = 1, limit: int = 10, cursor: Optional[int] = None,
+                university: Optional[str] = None, has_specialization: Optional[bool] = None,
+                columns: Optional[List[str]] = None) -> Tuple[int, List[dict]]:
+        # page is kept for existing clients; cursor (the last id seen) avoids scanning skipped rows
+        offset = 0 if cursor is not None else (page - 1) * limit
+        rows = self.db.list_faculty(limit, cursor, offset, university, has_specialization, columns)
+        return self.count(university, has_specialization), rows
 
-    def get_all(self, page: int = 1, limit: int = 10) -> Tuple[int, List[dict]]:
-        offset = (page - 1) * limit
-        conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM faculty")
-        total = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT * FROM faculty LIMIT ? OFFSET ?", (limit, offset))
-        rows = cursor.fetchall()
-        conn.close()
-        
-        return total, [dict(row) for row in rows]
+    def iter_all(self, university: Optional[str] = None, has_specialization: Optional[bool] = None) -> Iterator[dict]:
+        return self.db.iter_faculty(RECORD_COLUMNS, EXPORT_CHUNK_SIZE, university, has_specialization)
+
+    def count(self, university: Optional[str] = None, has_specialization: Optional[bool] = None) -> int:
+        # row_version lives in the database, so threads with different connections agree on it
+        key = (university, has_specialization, self.db.get_row_version())
+        total = self._counts.get(key)
+        if total is None:
+            total = self.db.count_faculty(university, has_specialization)
+            self._counts.put(key, total)
+        return total
 
     def get_by_id(self, faculty_id: int) -> Optional[dict]:
-        conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM faculty WHERE id = ?", (faculty_id,))
-        row = cursor.fetchone()
-        conn.close()
-        return dict(row) if row else None
-
-    def search(self, query: str, limit: int = 20) -> List[dict]:
+        return self.db.get_faculty_by_id(faculty_id)
+
+    def get_similar(self, faculty_id: int, limit: int = 10) -> List[dict]:
+        try:
+            return self.get_recommender().similar(faculty_id, top_n=limit)
+        except Exception:
+            return self.db.get_neighbors(faculty_id, limit)
+
+    def search(self, query: str, limit: int = 20, min_score: float = 0.0, mode: str = "semantic") -> List[dict]:
         if not query or len(query.strip()) < 2:
-            _, results = self.get_all(limit=limit)
+            _, results = self.get_all(limit=limit, columns=RECORD_COLUMNS)
             return results
 
-        from src.recommender import FacultyRecommender
+        if mode == "lexical":
+            return self.search_lexical(query, limit)
+
         try:
-            recommender = FacultyRecommender()
-            return recommender.recommend(query, top_n=limit)
+            recommender = self.get_recommender()
+            if mode == "hybrid":
+                return recommender.recommend_hybrid(query, top_n=limit, min_score=min_score)
+            return recommender.recommend(query, top_n=limit, min_score=min_score)
         except Exception:
-            conn = self.db.get_connection()
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
-            search_term = f"%{query}%"
-            cursor.execute("""
-                SELECT * FROM faculty 
-                WHERE name LIKE ? 
-                OR specialization LIKE ? 
-                OR biography LIKE ?
-                LIMIT ?
-            """, (search_term, search_term, search_term, limit))
-            rows = cursor.fetchall()
-            conn.close()
-            return [dict(row) for row in rows]
+            return self.search_lexical(query, limit)
+
+    def search_lexical(self, query: str, limit: int = 20) -> List[dict]:
+        try:
+            return self.db.search_fulltext(query, limit)
+        except sqlite3.OperationalError as e:
+            # No faculty_fts (FTS5 missing or schema not initialised yet)
+            logger.warning(f"Full-text search unavailable, using LIKE scan: {e}")
+            return self.db.search_like(query, limit)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[dict]:
+        try:
+            return self.db.suggest_names(prefix, limit)
+        except sqlite3.OperationalError:
+            return self.db.query_all(
+                "SELECT id, name, specialization FROM faculty WHERE name LIKE ? ORDER BY name LIMIT ?", (f"{prefix}%", limit)
+            )
+
+    def search_batch(self, queries: List[str], limit: int = 10, min_score: float = 0.0) -> List[List[dict]]:
+        # Queries too short to rank keep the single-search behaviour
+        ranked = [i for i, query in enumerate(queries) if query and len(query.strip()) >= 2]
+        try:
+            recommender = self.get_recommender()
+            batch = recommender.recommend_batch([queries[i] for i in ranked], top_n=limit, min_score=min_score)
+        except Exception:
+            # Same fallback as search(): each query is answered on its own, lexically if need be
+            return [self.search(query, limit, min_score) for query in queries]
+
+        results = [None] * len(queries)
+        for i, matches in zip(ranked, batch):
+            results[i] = matches
+        return [matches if matches is not None else self.search(queries[i], limit) for i, matches in enumerate(results)]
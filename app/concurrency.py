@@ -0,0 +1,42 @@
+import functools
+from typing import AsyncIterator, Callable, Iterator, TypeVar
+import anyio
+import anyio.to_thread
+
+T = TypeVar("T")
+
+class PoolSaturated(Exception):
+    def __init__(self, name: str):
+        super().__init__(f"{name} pool is saturated")
+        self.name = name
+
+class WorkerPool:
+    # Runs blocking calls (sqlite3, scoring) in threads, at most `concurrency` at a time.
+    # Once `max_waiting` callers are already queued, new work is rejected instead of piling up.
+    def __init__(self, name: str, concurrency: int, max_waiting: int):
+        self.name = name
+        self.limiter = anyio.CapacityLimiter(concurrency)
+        self.max_waiting = max_waiting
+        # Counted here rather than read from the limiter, which only sees callers once they block
+        self.in_flight = 0
+
+    def ensure_capacity(self) -> None:
+        if self.in_flight >= self.limiter.total_tokens + self.max_waiting:
+            raise PoolSaturated(self.name)
+
+    async def run(self, func: Callable[..., T], *args, **kwargs) -> T:
+        self.ensure_capacity()
+        self.in_flight += 1
+        try:
+            return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs), limiter=self.limiter)
+        finally:
+            self.in_flight -= 1
+
+    async def iterate(self, iterator: Iterator[T]) -> AsyncIterator[T]:
+        # A response that has started streaming is never rejected, it just waits its turn
+        done = object()
+        while True:
+            item = await anyio.to_thread.run_sync(next, iterator, done, limiter=self.limiter)
+            if item is done:
+                return
+            yield item
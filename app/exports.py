@@ -0,0 +1,57 @@
+import csv
+import io
+import json
+import zlib
+from typing import Dict, Iterable, Iterator, List
+
+def csv_chunks(rows: Iterable[Dict], columns: List[str], rows_per_chunk: int = 500) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 1
+    for row in rows:
+        writer.writerow([row.get(column) for column in columns])
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+def _json_row(row: Dict) -> str:
+    return json.dumps(row, ensure_ascii=False, default=str)
+
+def ndjson_chunks(rows: Iterable[Dict], rows_per_chunk: int = 500) -> Iterator[bytes]:
+    lines = []
+    for row in rows:
+        lines.append(_json_row(row))
+        if len(lines) >= rows_per_chunk:
+            yield ("\n".join(lines) + "\n").encode('utf-8')
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode('utf-8')
+
+def json_array_chunks(rows: Iterable[Dict], rows_per_chunk: int = 500) -> Iterator[bytes]:
+    # Same bytes as json.dumps(list(rows)) would give, without holding the list
+    yield b"["
+    items = []
+    first = True
+    for row in rows:
+        items.append(_json_row(row))
+        if len(items) >= rows_per_chunk:
+            yield (("" if first else ", ") + ", ".join(items)).encode('utf-8')
+            items, first = [], False
+    if items:
+        yield (("" if first else ", ") + ", ".join(items)).encode('utf-8')
+    yield b"]"
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    # wbits=31 writes a gzip header and trailer, so the output is a regular .gz stream
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -1,17 +1,37 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse, JSONResponse
 from typing import List, Optional
-import io
-import pandas as pd
-from .schemas import FacultyResponse, PaginatedFacultyResponse
+from contextlib import asynccontextmanager
+import anyio.to_thread
+from .schemas import FacultyResponse, FacultyMatchResponse, PaginatedFacultyResponse, BatchSearchRequest, BatchSearchResult, FacultySuggestion
 from .api import FacultyAPI
+from .exports import csv_chunks, json_array_chunks, ndjson_chunks, gzip_chunks
+from .concurrency import WorkerPool, PoolSaturated
+from src.database import RECORD_COLUMNS, resolve_columns
+from src.config import EXPORT_CHUNK_SIZE, SEARCH_CONCURRENCY, SEARCH_QUEUE_LIMIT, DB_CONCURRENCY, DB_QUEUE_LIMIT
+
+api = FacultyAPI()
+# All FacultyAPI calls are blocking (sqlite3, scikit-learn), so handlers hand them to these pools
+# and the event loop stays free to serve other requests.
+search_pool = WorkerPool("search", SEARCH_CONCURRENCY, SEARCH_QUEUE_LIMIT)
+db_pool = WorkerPool("database", DB_CONCURRENCY, DB_QUEUE_LIMIT)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await anyio.to_thread.run_sync(api.warm_up)
+    yield
 
 app = FastAPI(
     title="Faculty Finder API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+@app.exception_handler(PoolSaturated)
+async def pool_saturated_handler(request: Request, exc: PoolSaturated):
+    return JSONResponse(status_code=503, content={"detail": "Server busy, retry shortly"}, headers={"Retry-After": "1"})
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -20,8 +40,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-api = FacultyAPI()
-
 @app.get("/")
 async def root():
     return {
@@ -30,44 +48,92 @@ async def root():
         "endpoints": {
             "list": "/api/faculty",
             "search": "/api/faculty/search?q={query}",
+            "search_lexical": "/api/faculty/search?q={query}&mode=lexical",
+            "search_hybrid": "/api/faculty/search?q={query}&mode=hybrid",
+            "search_batch": "POST /api/faculty/search/batch",
+            "suggest": "/api/faculty/suggest?q={prefix}",
             "details": "/api/faculty/{id}",
+            "similar": "/api/faculty/{id}/similar",
             "export_csv": "/api/faculty/export/csv",
-            "export_json": "/api/faculty/export/json"
+            "export_json": "/api/faculty/export/json",
+            "export_ndjson": "/api/faculty/export/ndjson"
         }
     }
 
-@app.get("/api/faculty", response_model=PaginatedFacultyResponse)
-async def list_faculty(page: int = Query(1, ge=1), limit: int = Query(10, ge=1, le=100)):
-    total, data = api.get_all(page, limit)
+# Unset fields are dropped, so columns that were not requested are absent rather than null
+@app.get("/api/faculty", response_model=PaginatedFacultyResponse, response_model_exclude_unset=True)
+async def list_faculty(
+    page: int = Query(1, ge=1),
+    limit: int = Query(10, ge=1, le=100),
+    cursor: Optional[int] = Query(None, ge=0, description="next_cursor from the previous page"),
+    university: Optional[str] = None,
+    has_specialization: Optional[bool] = None,
+    fields: Optional[str] = Query(None, description="Extra comma-separated columns (e.g. biography,publications) or 'all'")
+):
+    try:
+        columns = resolve_columns(fields.split(",") if fields else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    total, data = await db_pool.run(api.get_all, page, limit, cursor, university, has_specialization, columns)
     return {
         "total": total,
         "page": page,
         "limit": limit,
+        "next_cursor": data[-1]["id"] if len(data) == limit else None,
         "data": data
     }
 
 @app.get("/api/faculty/search", response_model=List[FacultyResponse])
-async def search_faculty(q: str = Query(..., min_length=2)):
-    return api.search(q)
+async def search_faculty(
+    q: str = Query(..., min_length=2),
+    min_score: float = Query(0.0, ge=0.0, le=1.0),
+    mode: str = Query("semantic", pattern="^(semantic|lexical|hybrid)$")
+):
+    pool = db_pool if mode == "lexical" else search_pool
+    return await pool.run(api.search, q, min_score=min_score, mode=mode)
+
+@app.get("/api/faculty/suggest", response_model=List[FacultySuggestion])
+async def suggest_faculty(q: str = Query(..., min_length=1), limit: int = Query(10, ge=1, le=50)):
+    return await db_pool.run(api.suggest, q, limit)
+
+@app.post("/api/faculty/search/batch", response_model=List[BatchSearchResult])
+async def search_faculty_batch(request: BatchSearchRequest):
+    matches = await search_pool.run(api.search_batch, request.queries, request.limit, request.min_score)
+    return [{"query": query, "results": results} for query, results in zip(request.queries, matches)]
+
+def export_response(request: Request, chunks, media_type: str, filename: str) -> StreamingResponse:
+    db_pool.ensure_capacity()
+    headers = {"Content-Disposition": f"attachment; filename={filename}", "Vary": "Accept-Encoding"}
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(db_pool.iterate(chunks), media_type=media_type, headers=headers)
 
 @app.get("/api/faculty/export/csv")
-async def export_csv():
-    _, data = api.get_all(page=1, limit=1000)
-    df = pd.DataFrame(data)
-    stream = io.StringIO()
-    df.to_csv(stream, index=False)
-    response = StreamingResponse(iter([stream.getvalue()]), media_type="text/csv")
-    response.headers["Content-Disposition"] = "attachment; filename=faculty_data.csv"
-    return response
+async def export_csv(request: Request, university: Optional[str] = None, has_specialization: Optional[bool] = None):
+    rows = api.iter_all(university, has_specialization)
+    return export_response(request, csv_chunks(rows, RECORD_COLUMNS, EXPORT_CHUNK_SIZE), "text/csv", "faculty_data.csv")
 
 @app.get("/api/faculty/export/json")
-async def export_json():
-    _, data = api.get_all(page=1, limit=1000)
-    return JSONResponse(content=data, headers={"Content-Disposition": "attachment; filename=faculty_data.json"})
+async def export_json(request: Request, university: Optional[str] = None, has_specialization: Optional[bool] = None):
+    rows = api.iter_all(university, has_specialization)
+    return export_response(request, json_array_chunks(rows, EXPORT_CHUNK_SIZE), "application/json", "faculty_data.json")
+
+@app.get("/api/faculty/export/ndjson")
+async def export_ndjson(request: Request, university: Optional[str] = None, has_specialization: Optional[bool] = None):
+    rows = api.iter_all(university, has_specialization)
+    return export_response(request, ndjson_chunks(rows, EXPORT_CHUNK_SIZE), "application/x-ndjson", "faculty_data.ndjson")
 
 @app.get("/api/faculty/{faculty_id}", response_model=FacultyResponse)
 async def get_faculty(faculty_id: int):
-    faculty = api.get_by_id(faculty_id)
+    faculty = await db_pool.run(api.get_by_id, faculty_id)
     if not faculty:
         raise HTTPException(status_code=404, detail="Faculty not found")
     return faculty
+
+@app.get("/api/faculty/{faculty_id}/similar", response_model=List[FacultyMatchResponse])
+async def similar_faculty(faculty_id: int, limit: int = Query(10, ge=1, le=50)):
+    if not await db_pool.run(api.get_by_id, faculty_id):
+        raise HTTPException(status_code=404, detail="Faculty not found")
+    return await search_pool.run(api.get_similar, faculty_id, limit)
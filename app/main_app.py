@@ -1,14 +1,11 @@
 import streamlit as st
 import sys
 import os
-import pandas as pd
-import json
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.database import DatabaseManager
+from src.database import DatabaseManager, RECORD_COLUMNS
 from src.config import DATABASE_PATH
-from src.recommender import FacultyRecommender
 
 st.set_page_config(
     page_title="Faculty Engine",
@@ -20,6 +17,8 @@ st.set_page_config(
 def load_faculty_system():
     db = DatabaseManager(DATABASE_PATH)
     try:
+        # Imported here so the numpy/scipy stack loads once, inside the cached resource
+        from src.recommender import FacultyRecommender
         recommender = FacultyRecommender()
         error = None
     except Exception as e:
@@ -29,6 +28,10 @@ def load_faculty_system():
 
 db, recommender, load_error = load_faculty_system()
 
+if recommender and recommender.is_stale():
+    load_faculty_system.clear()
+    db, recommender, load_error = load_faculty_system()
+
 if 'active_profile' not in st.session_state:
     st.session_state.active_profile = None
 
@@ -147,7 +150,7 @@ if q:
         results = []
     st.caption(f"Semantic Ranking Results ({len(results)})")
 else:
-    results = db.get_all_faculty()[:12]
+    results = db.list_faculty(12, columns=RECORD_COLUMNS)
     st.caption("Active Directory Overview")
 
 for i in range(0, len(results), 3):
@@ -204,6 +207,13 @@ if st.session_state.active_profile:
         
         st.markdown("**Contact Information**")
         st.code(f['email'])
+
+        if recommender:
+            similar = recommender.similar(f['id'], top_n=5)
+            if similar:
+                st.markdown("**Similar Faculty**")
+                for n in similar:
+                    st.button(f"{n['name']} ({n['match_score']}%)", key=f"sim_{f['id']}_{n['id']}", on_click=view_profile, args=(n,))
         
         st.write("")
         if st.button("Close Viewer", type="primary", on_click=exit_profile):
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
+from src.config import BATCH_SEARCH_MAX_QUERIES
 
 class FacultyBase(BaseModel):
     name: str
@@ -27,4 +28,23 @@ class PaginatedFacultyResponse(BaseModel):
     total: int
     page: int
     limit: int
+    next_cursor: Optional[int] = None
     data: List[FacultyResponse]
+
+class FacultyMatchResponse(FacultyResponse):
+    match_score: Optional[float] = None
+    matching_keywords: List[str] = []
+
+class FacultySuggestion(BaseModel):
+    id: int
+    name: str
+    specialization: Optional[str] = None
+
+class BatchSearchRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=BATCH_SEARCH_MAX_QUERIES)
+    limit: int = Field(10, ge=1, le=100)
+    min_score: float = Field(0.0, ge=0.0, le=1.0)
+
+class BatchSearchResult(BaseModel):
+    query: str
+    results: List[FacultyMatchResponse]
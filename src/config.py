@@ -13,11 +13,19 @@ FACULTY_URLS = [
 DATABASE_PATH = os.path.join(BASE_DIR, "database", "faculty.db")
 RAW_DATA_DIR = os.path.join(BASE_DIR, "data", "raw")
 PROCESSED_DATA_DIR = os.path.join(BASE_DIR, "data", "processed")
+SYNONYMS_PATH = os.path.join(BASE_DIR, "data", "synonyms.json")
+CRAWL_MANIFEST_PATH = os.path.join(RAW_DATA_DIR, "crawl_manifest.json")
+CHANGED_SLUGS_PATH = os.path.join(RAW_DATA_DIR, "changed_slugs.json")
 
 REQUEST_DELAY = 1.0
 MAX_RETRIES = 3
 TIMEOUT = 10
 
+# Async crawl mode: politeness is enforced per host by a token bucket instead of a fixed sleep
+MAX_CONCURRENCY_PER_HOST = 4
+RATE_LIMIT_PER_SECOND = 2.0
+RATE_LIMIT_BURST = 4
+
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
 
 HEADERS = {
@@ -29,8 +37,52 @@ HEADERS = {
     "Upgrade-Insecure-Requests": "1"
 }
 
+# HTML parsing is CPU-bound; >1 spreads files across a process pool
+PARSE_WORKERS = 1
+PARSE_CHUNK_SIZE = 16
+
+INGEST_CHUNK_SIZE = 500
+EMBEDDING_WRITE_CHUNK_SIZE = 1000
+
+SQLITE_BUSY_TIMEOUT = 5.0
+SQLITE_CACHE_SIZE_KB = 16384
+SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+SQLITE_STATEMENT_CACHE = 256
+
+QUERY_CACHE_SIZE = 1024
+QUERY_CACHE_TTL = 300.0
+BATCH_SEARCH_MAX_QUERIES = 500
+COUNT_CACHE_TTL = 60.0
+EXPORT_CHUNK_SIZE = 500
+
+# API worker threads: scoring and plain database reads get separate pools so slow searches
+# cannot starve list/detail requests. Requests beyond the queue limit get a 503.
+SEARCH_CONCURRENCY = 4
+SEARCH_QUEUE_LIMIT = 32
+DB_CONCURRENCY = 16
+DB_QUEUE_LIMIT = 128
+NEIGHBORS_K = 10
+NEIGHBOR_BLOCK_SIZE = 512
+
 MODELS_DIR = os.path.join(BASE_DIR, "models")
 VECTORIZER_PATH = os.path.join(MODELS_DIR, "tfidf_vectorizer.pkl")
+QUERY_VECTORIZER_PATH = os.path.join(MODELS_DIR, "query_vectorizer.npz")
+INDEX_DIR = os.path.join(MODELS_DIR, "index")
 
-if not os.path.exists(MODELS_DIR):
-    os.makedirs(MODELS_DIR)
+# Hybrid search: BM25 over per-field sub-indexes fused with the TF-IDF cosine ranking
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "specialization": 2.0,
+    "biography": 1.0,
+    "teaching": 0.5,
+    "publications": 0.5
+}
+BM25_K1 = 1.2
+BM25_B = 0.75
+# "rrf" (reciprocal rank fusion) or "linear" (max-normalised weighted sum)
+HYBRID_FUSION = "rrf"
+HYBRID_COSINE_WEIGHT = 1.0
+HYBRID_BM25_WEIGHT = 1.0
+RRF_K = 60
+# Candidates taken from each ranker before fusion
+HYBRID_DEPTH = 100
@@ -0,0 +1,121 @@
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+try:
+    from .config import RAW_DATA_DIR, CRAWL_MANIFEST_PATH, CHANGED_SLUGS_PATH
+except ImportError:
+    from config import RAW_DATA_DIR, CRAWL_MANIFEST_PATH, CHANGED_SLUGS_PATH
+
+logger = logging.getLogger(__name__)
+
+def content_hash(body: str) -> str:
+    return hashlib.sha256(body.encode('utf-8')).hexdigest()
+
+def _write_json(path: str, payload: dict) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+class CrawlManifest:
+    def __init__(self, path: str = CRAWL_MANIFEST_PATH):
+        self.path = path
+        self.profiles: Dict[str, dict] = {}
+        self.directories: Dict[str, dict] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.profiles = data.get('profiles', {})
+            self.directories = data.get('directories', {})
+
+    def save(self) -> None:
+        _write_json(self.path, {'profiles': self.profiles, 'directories': self.directories})
+
+    @staticmethod
+    def _validators(entry: Optional[dict]) -> Dict[str, str]:
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def profile_headers(self, slug: str) -> Dict[str, str]:
+        # A 304 is only useful if we still have the body it refers to
+        if not os.path.exists(os.path.join(RAW_DATA_DIR, f"{slug}.html")):
+            return {}
+        return self._validators(self.profiles.get(slug))
+
+    def directory_headers(self, url: str) -> Dict[str, str]:
+        entry = self.directories.get(url)
+        if not entry or 'links' not in entry:
+            return {}
+        return self._validators(entry)
+
+    def record_profile(self, slug: str, url: str, headers, body: str) -> bool:
+        previous = self.profiles.get(slug, {})
+        digest = content_hash(body)
+        self.profiles[slug] = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'sha256': digest,
+            'fetched_at': datetime.now(timezone.utc).isoformat(),
+        }
+        return previous.get('sha256') != digest
+
+    def record_directory(self, url: str, headers, body: str, links: List[str]) -> None:
+        self.directories[url] = {
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'sha256': content_hash(body),
+            'links': links,
+        }
+
+    def cached_links(self, url: str) -> List[str]:
+        return list(self.directories.get(url, {}).get('links', []))
+
+    def prune(self, seen_slugs) -> List[str]:
+        removed = sorted(set(self.profiles) - set(seen_slugs))
+        for slug in removed:
+            del self.profiles[slug]
+        return removed
+
+def write_changed_slugs(changed: List[str], removed: List[str], path: str = CHANGED_SLUGS_PATH) -> None:
+    # Merge into a list the --changed-only stages have not consumed yet; the manifest already holds
+    # the new hashes, so anything dropped here would never be flagged again
+    changed, removed = set(changed), set(removed)
+    pending = load_changed_slugs(path)
+    if pending:
+        changed |= set(pending['changed']) - removed
+        removed |= set(pending['removed']) - changed
+    _write_json(path, {
+        'generated_at': datetime.now(timezone.utc).isoformat(),
+        'changed': sorted(changed),
+        'removed': sorted(removed),
+    })
+    logger.info(f"Crawl changes: {len(changed)} changed, {len(removed)} removed pending.")
+
+def clear_changed_slugs(path: str = CHANGED_SLUGS_PATH) -> None:
+    # Called by the last --changed-only stage once every change has reached the database and index
+    if os.path.exists(path):
+        _write_json(path, {'generated_at': datetime.now(timezone.utc).isoformat(), 'changed': [], 'removed': []})
+
+def load_changed_slugs(path: str = CHANGED_SLUGS_PATH) -> Optional[Dict[str, List[str]]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {'changed': data.get('changed', []), 'removed': data.get('removed', [])}
+
+def changed_source_files(path: str = CHANGED_SLUGS_PATH) -> Optional[Dict[str, List[str]]]:
+    changes = load_changed_slugs(path)
+    if changes is None:
+        return None
+    return {key: [f"{slug}.html" for slug in slugs] for key, slugs in changes.items()}
@@ -1,11 +1,30 @@
 import logging
 import os
 from typing import Dict, Optional, List
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
 import re
 
 logger = logging.getLogger(__name__)
 
+FIELD_CLASSES = {
+    "name": "field--name-field-faculty-names",
+    "image": "field--name-field-faculty-image",
+    "education": "field--name-field-faculty-name",
+    "contact_no": "field--name-field-contact-no",
+    "address": "field--name-field-address",
+    "email": "field--name-field-email",
+}
+
+# (output key, h2 header text, fallback field class)
+SECTIONS = [
+    ("biography", "Biography", "field--name-field-biography"),
+    ("specialization", "Specialization", "field--name-field-specialization"),
+    ("teaching", "Teaching", "field--name-field-teaching"),
+    ("publications", "Publications", "field--name-field-publication"),
+]
+
+WATCHED_CLASSES = frozenset(list(FIELD_CLASSES.values()) + [fallback for _, _, fallback in SECTIONS])
+
 class FacultyCleaner:
     def __init__(self, base_url: str = "https://www.daiict.ac.in"):
         self.base_url = base_url
@@ -23,38 +42,99 @@ class FacultyCleaner:
         email = email_text.replace('[at]', '@').replace('[dot]', '.')
         return email.strip()
 
-    def get_section_content(self, soup: BeautifulSoup, section_title: str, fallback_class: str = None) -> str:
-        header = soup.find('h2', string=lambda t: t and section_title.lower() in t.lower())
-        if header:
-            content_div = header.find_next(['div', 'p'])
+    def _scan(self, soup: BeautifulSoup) -> Dict[str, dict]:
+        # One document-order walk that records everything the separate find() calls used to look for:
+        # the first tag carrying each watched class, the first <h1>, and for each section the first
+        # matching <h2> plus the next <div>/<p> after it (what header.find_next(['div', 'p']) returns).
+        first_by_class = {}
+        first_h1 = None
+        headers_found = set()
+        section_content = {}
+        pending = []
+
+        for node in soup.descendants:
+            if not isinstance(node, Tag):
+                continue
+            name = node.name
+
+            if pending and (name == 'div' or name == 'p'):
+                for key in pending:
+                    section_content[key] = node
+                pending = []
+
+            classes = node.get('class')
+            if classes:
+                for class_name in classes:
+                    if class_name in WATCHED_CLASSES and class_name not in first_by_class:
+                        first_by_class[class_name] = node
+
+            if name == 'h2' and len(headers_found) < len(SECTIONS):
+                header_text = node.string
+                if header_text:
+                    lowered = header_text.lower()
+                    for key, title, _ in SECTIONS:
+                        if key not in headers_found and title.lower() in lowered:
+                            headers_found.add(key)
+                            pending.append(key)
+            elif name == 'h1' and first_h1 is None:
+                first_h1 = node
+
+        return {
+            "classes": first_by_class,
+            "h1": first_h1,
+            "headers": headers_found,
+            "sections": section_content,
+        }
+
+    def _field_text(self, field: Optional[Tag]) -> str:
+        if not field:
+            return ""
+        item = field.find(class_="field__item")
+        if item:
+            return item.get_text()
+        return field.get_text()
+
+    def _section_text(self, scan: Dict[str, dict], key: str, fallback_class: str) -> str:
+        if key in scan["headers"]:
+            content_div = scan["sections"].get(key)
             if content_div:
                 text = self.clean_text(content_div.get_text())
                 if text:
                     return text
 
-        if fallback_class:
-            field = soup.find(class_=fallback_class)
-            if field:
-                return self.clean_text(field.get_text())
-                
+        field = scan["classes"].get(fallback_class)
+        if field:
+            return self.clean_text(field.get_text())
         return ""
 
+    def _image_url(self, image_field: Optional[Tag]) -> str:
+        if not image_field:
+            return ""
+        img = image_field.find('img')
+        if not img or not img.get('src'):
+            return ""
+
+        src = img['src']
+        if src.startswith('http'):
+            return src
+        return f"{self.base_url}{src}"
+
     def extract_faculty_data(self, html: str, file_name: str) -> Dict[str, str]:
         soup = BeautifulSoup(html, 'lxml')
+        scan = self._scan(soup)
+        fields = scan["classes"]
         
         data = {
-            "name": self.clean_text(self._get_field(soup, "field--name-field-faculty-names")),
-            "image_url": self._get_image_url(soup),
-            "education": self.clean_text(self._get_field(soup, "field--name-field-faculty-name")),
-            "contact_no": self.clean_text(self._get_field(soup, "field--name-field-contact-no")),
-            "address": self.clean_text(self._get_field(soup, "field--name-field-address")),
-            "email": self.decode_email(self._get_field(soup, "field--name-field-email")),
-            "biography": self.get_section_content(soup, "Biography", "field--name-field-biography"),
-            "specialization": self.get_section_content(soup, "Specialization", "field--name-field-specialization"),
-            "teaching": self.get_section_content(soup, "Teaching", "field--name-field-teaching"),
-            "publications": self.get_section_content(soup, "Publications", "field--name-field-publication"),
-            "raw_source_file": file_name
+            "name": self.clean_text(self._field_text(fields.get(FIELD_CLASSES["name"]))),
+            "image_url": self._image_url(fields.get(FIELD_CLASSES["image"])),
+            "education": self.clean_text(self._field_text(fields.get(FIELD_CLASSES["education"]))),
+            "contact_no": self.clean_text(self._field_text(fields.get(FIELD_CLASSES["contact_no"]))),
+            "address": self.clean_text(self._field_text(fields.get(FIELD_CLASSES["address"]))),
+            "email": self.decode_email(self._field_text(fields.get(FIELD_CLASSES["email"]))),
         }
+        for key, _, fallback_class in SECTIONS:
+            data[key] = self._section_text(scan, key, fallback_class)
+        data["raw_source_file"] = file_name
         
         if not data["biography"] and data["specialization"]:
             spec_text = data["specialization"]
@@ -63,30 +143,8 @@ class FacultyCleaner:
                 data["specialization"] = ""
         
         if not data["name"]:
-            h1 = soup.find('h1')
+            h1 = scan["h1"]
             if h1:
                 data["name"] = self.clean_text(h1.get_text())
                 
         return data
-
-    def _get_field(self, soup: BeautifulSoup, class_name: str) -> str:
-        field = soup.find(class_=class_name)
-        if not field:
-            return ""
-        item = field.find(class_="field__item")
-        if item:
-            return item.get_text()
-        return field.get_text()
-
-    def _get_image_url(self, soup: BeautifulSoup) -> str:
-        image_field = soup.find(class_="field--name-field-faculty-image")
-        if not image_field:
-            return ""
-        img = image_field.find('img')
-        if not img or not img.get('src'):
-            return ""
-        
-        src = img['src']
-        if src.startswith('http'):
-            return src
-        return f"{self.base_url}{src}"
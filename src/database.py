@@ -1,22 +1,105 @@
+import os
+import re
 import sqlite3
 import logging
-from typing import List, Dict, Any, Optional
-from src.config import DATABASE_PATH
+import threading
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Iterator
+from src.config import DATABASE_PATH, SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE, SQLITE_STATEMENT_CACHE, SQLITE_BUSY_TIMEOUT, EMBEDDING_WRITE_CHUNK_SIZE
 
 logger = logging.getLogger(__name__)
 
+FACULTY_COLUMNS = [
+    'name', 'image_url', 'education', 'contact_no', 'address', 'email',
+    'biography', 'specialization', 'teaching', 'publications',
+    'raw_source_file', 'university'
+]
+# Columns that feed TFIDFEmbeddingGenerator.prepare_text; changing them invalidates the stored vector
+EMBEDDED_COLUMNS = ['specialization', 'biography']
+NATURAL_KEYS = ('raw_source_file', 'email')
+# Everything except the embedding blob, for reads that hand rows back to callers
+RECORD_COLUMNS = ['id', *FACULTY_COLUMNS, 'created_at']
+# Left out of list responses unless asked for; they dominate row size
+LARGE_TEXT_COLUMNS = ['biography', 'teaching', 'publications']
+SUMMARY_COLUMNS = [column for column in RECORD_COLUMNS if column not in LARGE_TEXT_COLUMNS]
+# Must match the partial index predicate verbatim for SQLite to use idx_has_specialization
+SPECIALIZATION_PRESENT = "specialization IS NOT NULL AND specialization NOT IN ('', 'Not Provided')"
+# Indexed by faculty_fts, with their BM25 weights
+FULLTEXT_COLUMNS = ['name', 'specialization', 'biography']
+FULLTEXT_WEIGHTS = [10.0, 4.0, 1.0]
+# Stay well under SQLITE_MAX_VARIABLE_NUMBER on older builds
+MAX_IN_PARAMS = 500
+
+# Per-connection settings only; journal_mode is stored in the file, so init_db sets it once
+CONNECTION_PRAGMAS = [
+    "PRAGMA synchronous = NORMAL",
+    f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}",
+    f"PRAGMA cache_size = -{SQLITE_CACHE_SIZE_KB}",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA foreign_keys = ON",
+]
+
+def _fts_phrase(token: str) -> str:
+    return '"' + token.replace('"', '""') + '"'
+
+def fulltext_query(text: str) -> str:
+    # Quote every word so user input can never be parsed as FTS5 syntax; any word may match
+    return " OR ".join(_fts_phrase(token) for token in re.findall(r"\w+", text.lower()))
+
+def name_prefix_query(text: str) -> str:
+    tokens = re.findall(r"\w+", text.lower())
+    if not tokens:
+        return ""
+    terms = [_fts_phrase(token) for token in tokens[:-1]] + [_fts_phrase(tokens[-1]) + "*"]
+    return "name : (" + " AND ".join(terms) + ")"
+
+def resolve_columns(fields: Optional[Iterable[str]] = None) -> List[str]:
+    requested = {field.strip() for field in fields or [] if field.strip()}
+    if 'all' in requested:
+        return list(RECORD_COLUMNS)
+    unknown = requested - set(RECORD_COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [column for column in RECORD_COLUMNS if column in SUMMARY_COLUMNS or column in requested]
+
 class DatabaseManager:
     def __init__(self, db_path: str = DATABASE_PATH):
         self.db_path = db_path
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        # A persistent connection keeps sqlite3's prepared-statement cache warm across calls
+        conn = sqlite3.connect(self.db_path, timeout=SQLITE_BUSY_TIMEOUT, cached_statements=SQLITE_STATEMENT_CACHE)
+        for pragma in CONNECTION_PRAGMAS:
+            try:
+                conn.execute(pragma)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not apply '{pragma}' to {self.db_path}: {e}")
+        return conn
 
-    def get_connection(self):
-        return sqlite3.connect(self.db_path)
+    def get_connection(self) -> sqlite3.Connection:
+        # One connection per thread (sqlite3 connections are not shareable across threads),
+        # recreated after a fork so worker processes never inherit the parent's handle.
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._connect()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local.conn = None
 
     def init_db(self):
         conn = self.get_connection()
         cursor = conn.cursor()
-        
-        cursor.execute("PRAGMA foreign_keys = ON;")
+        try:
+            cursor.execute("PRAGMA journal_mode = WAL")
+        except sqlite3.Error as e:
+            logger.warning(f"Could not enable WAL on {self.db_path}: {e}")
         
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS faculty (
@@ -41,11 +124,121 @@ class DatabaseManager:
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_name ON faculty(name);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_email ON faculty(email);")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_university ON faculty(university);")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_raw_source_file ON faculty(raw_source_file);")
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_has_specialization ON faculty(id) WHERE {SPECIALIZATION_PRESENT};")
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS index_state (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL DEFAULT 0
+            );
+        """)
+        cursor.execute("INSERT OR IGNORE INTO index_state (key, value) VALUES ('embedding_version', 0);")
+        cursor.execute("INSERT OR IGNORE INTO index_state (key, value) VALUES ('row_version', 0);")
+
+        # embedding_version only moves when a stored vector actually changes, so recommenders rebuild
+        # their index (and the shared artifact goes stale) only then. Upserts keep the vector by
+        # assigning it to itself, which the WHEN clause ignores.
+        cursor.execute("DROP TRIGGER IF EXISTS trg_faculty_embedding_update;")
+        cursor.execute("DROP TRIGGER IF EXISTS trg_faculty_delete;")
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_faculty_vector_update
+            AFTER UPDATE OF embedding ON faculty WHEN old.embedding IS NOT new.embedding
+            BEGIN
+                UPDATE index_state SET value = value + 1 WHERE key = 'embedding_version';
+            END;
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_faculty_vector_delete
+            AFTER DELETE ON faculty WHEN old.embedding IS NOT NULL
+            BEGIN
+                UPDATE index_state SET value = value + 1 WHERE key = 'embedding_version';
+            END;
+        """)
+
+        # row_version moves on any change to the stored profiles, for caches of row data
+        for event in ("INSERT", "DELETE", f"UPDATE OF {', '.join(FACULTY_COLUMNS)}"):
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_faculty_row_{event.split()[0].lower()}
+                AFTER {event} ON faculty
+                BEGIN
+                    UPDATE index_state SET value = value + 1 WHERE key = 'row_version';
+                END;
+            """)
+
+        # Precomputed "more like this" lists; rank 1 is the most similar faculty
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS faculty_neighbors (
+                faculty_id INTEGER NOT NULL REFERENCES faculty(id) ON DELETE CASCADE,
+                rank INTEGER NOT NULL,
+                neighbor_id INTEGER NOT NULL REFERENCES faculty(id) ON DELETE CASCADE,
+                score REAL NOT NULL,
+                PRIMARY KEY (faculty_id, rank)
+            ) WITHOUT ROWID;
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_neighbors_neighbor_id ON faculty_neighbors(neighbor_id);")
+
+        # Lists that lost an entry because the neighbor was deleted (the cascade removes it silently);
+        # the next embeddings run recomputes them and clears the row
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS stale_neighbor_lists (
+                faculty_id INTEGER PRIMARY KEY
+            );
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_neighbors_orphaned
+            AFTER DELETE ON faculty_neighbors
+            WHEN NOT EXISTS (SELECT 1 FROM faculty WHERE id = old.neighbor_id)
+                AND EXISTS (SELECT 1 FROM faculty WHERE id = old.faculty_id)
+            BEGIN
+                INSERT OR IGNORE INTO stale_neighbor_lists (faculty_id) VALUES (old.faculty_id);
+            END;
+        """)
+
+        self._init_fulltext(cursor)
         
         conn.commit()
-        conn.close()
         logger.info(f"Database initialized at {self.db_path}")
 
+    def _init_fulltext(self, cursor: sqlite3.Cursor):
+        exists = cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'faculty_fts'").fetchone()
+        try:
+            # External-content table: it stores only the index, the text stays in faculty
+            cursor.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS faculty_fts USING fts5(
+                    {', '.join(FULLTEXT_COLUMNS)},
+                    content='faculty', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+                );
+            """)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 unavailable, lexical search will use LIKE scans: {e}")
+            return
+
+        columns = ", ".join(FULLTEXT_COLUMNS)
+        new_values = ", ".join(f"new.{column}" for column in FULLTEXT_COLUMNS)
+        old_values = ", ".join(f"old.{column}" for column in FULLTEXT_COLUMNS)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_faculty_fts_insert AFTER INSERT ON faculty BEGIN
+                INSERT INTO faculty_fts (rowid, {columns}) VALUES (new.id, {new_values});
+            END;
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_faculty_fts_delete AFTER DELETE ON faculty BEGIN
+                INSERT INTO faculty_fts (faculty_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+            END;
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_faculty_fts_update AFTER UPDATE OF {columns} ON faculty BEGIN
+                INSERT INTO faculty_fts (faculty_fts, rowid, {columns}) VALUES ('delete', old.id, {old_values});
+                INSERT INTO faculty_fts (rowid, {columns}) VALUES (new.id, {new_values});
+            END;
+        """)
+
+        if not exists:
+            # Index rows that were there before the table existed
+            cursor.execute("INSERT INTO faculty_fts (faculty_fts) VALUES ('rebuild');")
+
     def insert_faculty_bulk(self, faculty_list: List[Dict[str, Any]]) -> int:
         if not faculty_list:
             return 0
@@ -88,44 +281,305 @@ class DatabaseManager:
             logger.error(f"Database error during bulk insert: {e}")
             conn.rollback()
             raise
-        finally:
-            conn.close()
 
-    def get_all_faculty(self) -> List[Dict[str, Any]]:
+    def upsert_faculty_stream(self, chunks: Iterable[List[Dict[str, Any]]], key: str = 'raw_source_file',
+                              delete_missing: bool = False, delete_keys: Optional[List[str]] = None) -> Dict[str, int]:
+        if key not in NATURAL_KEYS:
+            raise ValueError(f"Unsupported natural key '{key}', expected one of {NATURAL_KEYS}")
+
+        update_columns = [c for c in FACULTY_COLUMNS if c != key]
+        changed = " OR ".join(f"{c} IS NOT ?" for c in update_columns)
+        invalidate = " OR ".join(f"{c} IS NOT ?" for c in EMBEDDED_COLUMNS)
+        update_query = f"""
+            UPDATE faculty SET {", ".join(f"{c} = ?" for c in update_columns)},
+                embedding = CASE WHEN {invalidate} THEN NULL ELSE embedding END
+            WHERE {key} = ? AND ({changed})
+        """
+        insert_query = f"""
+            INSERT INTO faculty ({", ".join(FACULTY_COLUMNS)})
+            SELECT {", ".join("?" for _ in FACULTY_COLUMNS)}
+            WHERE NOT EXISTS (SELECT 1 FROM faculty WHERE {key} = ?)
+        """
+
+        stats = {'inserted': 0, 'updated': 0, 'deleted': 0, 'unchanged': 0}
         conn = self.get_connection()
-        conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
-        
-        cursor.execute("SELECT * FROM faculty")
-        rows = cursor.fetchall()
-        
-        conn.close()
-        return [dict(row) for row in rows]
+        try:
+            cursor.execute("BEGIN")
+            if delete_missing:
+                cursor.execute("CREATE TEMP TABLE IF NOT EXISTS seen_keys (key TEXT PRIMARY KEY)")
+                cursor.execute("DELETE FROM temp.seen_keys")
+
+            for chunk in chunks:
+                for f in chunk:
+                    row = {c: f.get(c) for c in FACULTY_COLUMNS}
+                    if row['university'] is None:
+                        row['university'] = 'DA-IICT'
+                    values = [row[c] for c in update_columns]
+                    embedded = [row[c] for c in EMBEDDED_COLUMNS]
+
+                    cursor.execute(update_query, values + embedded + [row[key]] + values)
+                    if cursor.rowcount:
+                        stats['updated'] += 1
+                        continue
+
+                    cursor.execute(insert_query, [row[c] for c in FACULTY_COLUMNS] + [row[key]])
+                    if cursor.rowcount:
+                        stats['inserted'] += 1
+                    else:
+                        stats['unchanged'] += 1
+
+                if delete_missing:
+                    cursor.executemany("INSERT OR IGNORE INTO temp.seen_keys (key) VALUES (?)",
+                                       [(f.get(key),) for f in chunk])
+
+            if delete_missing:
+                cursor.execute(f"DELETE FROM faculty WHERE {key} NOT IN (SELECT key FROM temp.seen_keys)")
+                stats['deleted'] += cursor.rowcount
+            if delete_keys:
+                cursor.executemany(f"DELETE FROM faculty WHERE {key} = ?", [(k,) for k in delete_keys])
+                stats['deleted'] += cursor.rowcount
+
+            conn.commit()
+            logger.info(
+                f"Upserted faculty: {stats['inserted']} inserted, {stats['updated']} updated, "
+                f"{stats['unchanged']} unchanged, {stats['deleted']} deleted."
+            )
+            return stats
+        except sqlite3.Error as e:
+            logger.error(f"Database error during upsert: {e}")
+            conn.rollback()
+            raise
+        except BaseException:
+            # e.g. a parse error from the chunk reader: never leave the explicit BEGIN open on this
+            # thread's long-lived connection, where the next `with conn:` would commit half an ingest
+            conn.rollback()
+            raise
+
+    def query_all(self, sql: str, params: Iterable = ()) -> List[Dict[str, Any]]:
+        cursor = self.get_connection().cursor()
+        cursor.row_factory = sqlite3.Row
+        cursor.execute(sql, tuple(params))
+        return [dict(row) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _filters(university: Optional[str] = None, has_specialization: Optional[bool] = None) -> Tuple[List[str], List[Any]]:
+        where, params = [], []
+        if university is not None:
+            where.append("university = ?")
+            params.append(university)
+        if has_specialization is not None:
+            where.append(SPECIALIZATION_PRESENT if has_specialization else f"NOT ({SPECIALIZATION_PRESENT})")
+        return where, params
+
+    def list_faculty(self, limit: int, after_id: Optional[int] = None, offset: int = 0,
+                     university: Optional[str] = None, has_specialization: Optional[bool] = None,
+                     columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        # Keyset pagination: after_id is the last id of the previous page, so cost does not grow with depth
+        where, params = self._filters(university, has_specialization)
+        if after_id is not None:
+            where.append("id > ?")
+            params.append(after_id)
+
+        sql = f"SELECT {', '.join(columns or SUMMARY_COLUMNS)} FROM faculty"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id LIMIT ?"
+        params.append(limit)
+        if offset:
+            sql += " OFFSET ?"
+            params.append(offset)
+        return self.query_all(sql, params)
+
+    def iter_faculty(self, columns: Optional[List[str]] = None, chunk_size: int = 500,
+                     university: Optional[str] = None, has_specialization: Optional[bool] = None) -> Iterator[Dict[str, Any]]:
+        # One short keyset query per chunk, so the generator can be resumed from any thread's connection
+        after_id = None
+        columns = list(columns or RECORD_COLUMNS)
+        if 'id' not in columns:
+            columns = ['id'] + columns
+        while True:
+            rows = self.list_faculty(chunk_size, after_id, 0, university, has_specialization, columns)
+            yield from rows
+            if len(rows) < chunk_size:
+                return
+            after_id = rows[-1]['id']
+
+    def count_faculty(self, university: Optional[str] = None, has_specialization: Optional[bool] = None) -> int:
+        where, params = self._filters(university, has_specialization)
+        sql = "SELECT COUNT(*) FROM faculty"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self.get_connection().execute(sql, params).fetchone()[0]
+
+    def get_all_faculty(self) -> List[Dict[str, Any]]:
+        return self.query_all("SELECT * FROM faculty")
 
     def clear_table(self):
         conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("DELETE FROM faculty")
-        conn.commit()
-        conn.close()
+        with conn:
+            conn.execute("DELETE FROM faculty")
+
+    def get_faculty_missing_embeddings(self) -> List[Dict[str, Any]]:
+        return self.query_all("SELECT * FROM faculty WHERE embedding IS NULL")
 
     def update_faculty_embedding(self, faculty_id: int, embedding_blob: bytes):
         conn = self.get_connection()
-        cursor = conn.cursor()
         try:
-            cursor.execute("UPDATE faculty SET embedding = ? WHERE id = ?", (embedding_blob, faculty_id))
-            conn.commit()
+            with conn:
+                conn.execute("UPDATE faculty SET embedding = ? WHERE id = ?", (embedding_blob, faculty_id))
         except sqlite3.Error as e:
             logger.error(f"Error updating embedding for ID {faculty_id}: {e}")
-            conn.rollback()
-        finally:
-            conn.close()
+
+    def update_faculty_embeddings_bulk(self, embeddings: Iterable[Tuple[int, bytes]],
+                                       chunk_size: Optional[int] = EMBEDDING_WRITE_CHUNK_SIZE) -> int:
+        conn = self.get_connection()
+        updated = 0
+        try:
+            with conn:
+                # One transaction (one fsync) for the whole batch; chunking only bounds how many
+                # encoded blobs are held in memory at once.
+                rows = ((blob, faculty_id) for faculty_id, blob in embeddings)
+                while True:
+                    chunk = list(islice(rows, chunk_size)) if chunk_size else list(rows)
+                    if not chunk:
+                        break
+                    conn.executemany("UPDATE faculty SET embedding = ? WHERE id = ?", chunk)
+                    updated += len(chunk)
+                    if not chunk_size:
+                        break
+        except sqlite3.Error as e:
+            logger.error(f"Database error during bulk embedding update: {e}")
+            raise
+        logger.info(f"Stored {updated} embeddings.")
+        return updated
+
+    def get_embedding_rows(self) -> List[Tuple[int, bytes]]:
+        cursor = self.get_connection().execute(
+            "SELECT id, embedding FROM faculty WHERE embedding IS NOT NULL ORDER BY id"
+        )
+        return cursor.fetchall()
+
+    def _state_value(self, key: str) -> int:
+        try:
+            row = self.get_connection().execute("SELECT value FROM index_state WHERE key = ?", (key,)).fetchone()
+            return row[0] if row else 0
+        except sqlite3.OperationalError:
+            # Databases created before index_state existed have no version to track
+            return 0
+
+    def get_embedding_version(self) -> int:
+        return self._state_value('embedding_version')
+
+    def get_row_version(self) -> int:
+        # Database-wide, unlike PRAGMA data_version, so values read on different connections compare
+        return self._state_value('row_version')
 
     def get_faculty_by_id(self, faculty_id: int) -> Optional[Dict[str, Any]]:
+        rows = self.query_all(f"SELECT {', '.join(RECORD_COLUMNS)} FROM faculty WHERE id = ?", (faculty_id,))
+        return rows[0] if rows else None
+
+    def get_faculty_by_ids(self, faculty_ids: Iterable[int]) -> Dict[int, Dict[str, Any]]:
+        faculty_ids = list(dict.fromkeys(int(i) for i in faculty_ids))
+        columns = ", ".join(RECORD_COLUMNS)
+        rows = {}
+        for start in range(0, len(faculty_ids), MAX_IN_PARAMS):
+            chunk = faculty_ids[start:start + MAX_IN_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            for row in self.query_all(f"SELECT {columns} FROM faculty WHERE id IN ({placeholders})", chunk):
+                rows[row['id']] = row
+        return rows
+
+    def replace_neighbors(self, faculty_ids: Iterable[int], neighbors: Iterable[Tuple[int, int, int, float]]) -> int:
+        # neighbors are (faculty_id, rank, neighbor_id, score); the old lists of faculty_ids are dropped first
         conn = self.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM faculty WHERE id = ?", (faculty_id,))
-        row = cursor.fetchone()
-        conn.close()
-        return dict(row) if row else None
+        written = 0
+        try:
+            with conn:
+                faculty_ids = [(int(i),) for i in faculty_ids]
+                conn.executemany("DELETE FROM faculty_neighbors WHERE faculty_id = ?", faculty_ids)
+                conn.executemany("DELETE FROM stale_neighbor_lists WHERE faculty_id = ?", faculty_ids)
+                rows = iter(neighbors)
+                while True:
+                    chunk = list(islice(rows, EMBEDDING_WRITE_CHUNK_SIZE))
+                    if not chunk:
+                        break
+                    conn.executemany(
+                        "INSERT INTO faculty_neighbors (faculty_id, rank, neighbor_id, score) VALUES (?, ?, ?, ?)", chunk
+                    )
+                    written += len(chunk)
+        except sqlite3.Error as e:
+            logger.error(f"Database error while storing neighbor lists: {e}")
+            raise
+        logger.info(f"Stored {written} neighbor entries.")
+        return written
+
+    def get_neighbor_dependents(self, faculty_ids: Iterable[int]) -> List[int]:
+        # Lists that point at any of faculty_ids, plus lists that lost entries to deleted faculty
+        faculty_ids = [int(i) for i in faculty_ids]
+        dependents = set(self.get_stale_neighbor_lists())
+        for start in range(0, len(faculty_ids), MAX_IN_PARAMS):
+            chunk = faculty_ids[start:start + MAX_IN_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor = self.get_connection().execute(
+                f"SELECT DISTINCT faculty_id FROM faculty_neighbors WHERE neighbor_id IN ({placeholders})", chunk
+            )
+            dependents.update(row[0] for row in cursor)
+        return sorted(dependents)
+
+    def get_stale_neighbor_lists(self) -> List[int]:
+        return [row[0] for row in self.get_connection().execute("SELECT faculty_id FROM stale_neighbor_lists")]
+
+    def count_neighbor_lists(self) -> int:
+        return self.get_connection().execute("SELECT COUNT(DISTINCT faculty_id) FROM faculty_neighbors").fetchone()[0]
+
+    def get_neighbors(self, faculty_id: int, limit: int = 10) -> List[Dict[str, Any]]:
+        columns = ", ".join(f"f.{column}" for column in RECORD_COLUMNS)
+        try:
+            return self.query_all(f"""
+                SELECT {columns}, n.score AS similarity
+                FROM faculty_neighbors n JOIN faculty f ON f.id = n.neighbor_id
+                WHERE n.faculty_id = ?
+                ORDER BY n.rank
+                LIMIT ?
+            """, (faculty_id, limit))
+        except sqlite3.OperationalError:
+            # Databases created before neighbor lists existed
+            return []
+
+    def search_fulltext(self, query: str, limit: int = 20, columns: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        match = fulltext_query(query)
+        if not match:
+            return []
+        selected = ", ".join(f"f.{column}" for column in columns or RECORD_COLUMNS)
+        weights = ", ".join(str(weight) for weight in FULLTEXT_WEIGHTS)
+        # bm25() is lower-is-better, so ascending order puts the best match first
+        return self.query_all(f"""
+            SELECT {selected}
+            FROM faculty_fts JOIN faculty f ON f.id = faculty_fts.rowid
+            WHERE faculty_fts MATCH ?
+            ORDER BY bm25(faculty_fts, {weights})
+            LIMIT ?
+        """, (match, limit))
+
+    def suggest_names(self, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+        match = name_prefix_query(prefix)
+        if not match:
+            return []
+        return self.query_all("""
+            SELECT f.id, f.name, f.specialization
+            FROM faculty_fts JOIN faculty f ON f.id = faculty_fts.rowid
+            WHERE faculty_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+        """, (match, limit))
+
+    def search_like(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        search_term = f"%{query}%"
+        return self.query_all(f"""
+            SELECT {', '.join(RECORD_COLUMNS)} FROM faculty
+            WHERE name LIKE ?
+            OR specialization LIKE ?
+            OR biography LIKE ?
+            LIMIT ?
+        """, (search_term, search_term, search_term, limit))
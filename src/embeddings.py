@@ -1,10 +1,16 @@
 import logging
+import argparse
 import pickle
 import os
-import pandas as pd
+import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from src.database import DatabaseManager
-from src.config import DATABASE_PATH, BASE_DIR, VECTORIZER_PATH
+from src.search_index import SearchIndex
+from src.index_artifact import published_embedding_version, write_index_artifact
+from src.query_vectorizer import export_query_vectorizer
+from src.crawl_manifest import clear_changed_slugs
+from src.vector_codec import encode_vector, vectorizer_fingerprint
+from src.config import DATABASE_PATH, BASE_DIR, VECTORIZER_PATH, QUERY_VECTORIZER_PATH, INDEX_DIR, NEIGHBORS_K, NEIGHBOR_BLOCK_SIZE
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -28,8 +34,71 @@ class TFIDFEmbeddingGenerator:
         combined_text = f"{spec} {spec} {bio}"
         return combined_text.strip()
 
-    def generate_and_store_all(self):
+    def generate_missing(self):
+        self.db.init_db()
+        faculty_list = self.db.get_faculty_missing_embeddings()
+        # Deleted faculty leave no row to embed, but they still change the vector set the shared
+        # artifact was built from and shorten the neighbor lists that pointed at them
+        stale_lists = self.db.get_stale_neighbor_lists()
+        artifact_stale = published_embedding_version(INDEX_DIR) != self.db.get_embedding_version()
+        if not faculty_list and not stale_lists and not artifact_stale:
+            logger.info("All faculty already have embeddings, nothing to do.")
+            return
+
+        # Reuse the fitted vocabulary so unchanged vectors stay comparable with the new ones
+        with open(VECTORIZER_PATH, 'rb') as f:
+            self.vectorizer = pickle.load(f)
+        fingerprint = vectorizer_fingerprint(self.vectorizer)
+
+        if not faculty_list:
+            logger.info(f"No new vectors; republishing the index and refreshing {len(stale_lists)} neighbor lists.")
+            return self._publish_index(fingerprint, changed_ids=[])
+
+        tfidf_matrix = self.vectorizer.transform([self.prepare_text(f) for f in faculty_list])
+        logger.info(f"Storing {len(faculty_list)} new TF-IDF vectors in the database...")
+        self._store_vectors(faculty_list, tfidf_matrix, fingerprint, changed_ids=[f['id'] for f in faculty_list])
+
+    def _store_vectors(self, faculty_list: list, tfidf_matrix, fingerprint: int, changed_ids: list = None):
+        self.db.update_faculty_embeddings_bulk(
+            (faculty['id'], encode_vector(tfidf_matrix[i], fingerprint))
+            for i, faculty in enumerate(faculty_list)
+        )
+        self._publish_index(fingerprint, changed_ids)
+
+    def _publish_index(self, fingerprint: int, changed_ids: list = None):
+        # Tagged with the embedding version so recommenders can tell whether the artifact is current
+        index = SearchIndex.from_rows(
+            self.db.get_embedding_rows(), len(self.vectorizer.vocabulary_),
+            fingerprint, self.db.get_embedding_version()
+        )
+        write_index_artifact(INDEX_DIR, index, fingerprint)
+        self._refresh_neighbors(index, changed_ids)
+
+    def _refresh_neighbors(self, index: SearchIndex, changed_ids: list = None):
+        if changed_ids is None or self.db.count_neighbor_lists() == 0:
+            positions = np.arange(len(index))
+        else:
+            # A changed vector can only enter lists of rows it shares a term with, and only leave lists it was on
+            changed = index.positions_of(changed_ids)
+            dependents = index.positions_of(self.db.get_neighbor_dependents(changed_ids))
+            positions = np.union1d(changed, dependents)
+            if changed.size:
+                positions = np.union1d(positions, index.overlapping_rows(changed))
+
+        logger.info(f"Refreshing neighbor lists for {len(positions)} of {len(index)} faculty...")
+        neighbors = (
+            (int(index.ids[position]), rank, int(index.ids[neighbor]), float(score))
+            for position, rows, scores in index.neighbors(NEIGHBORS_K, positions, NEIGHBOR_BLOCK_SIZE)
+            for rank, (neighbor, score) in enumerate(zip(rows, scores), start=1)
+        )
+        self.db.replace_neighbors(index.ids[positions], neighbors)
+
+    def generate_and_store_all(self, changed_only: bool = False):
+        if changed_only and os.path.exists(VECTORIZER_PATH):
+            return self.generate_missing()
+
         logger.info("Fetching all faculty records for TF-IDF training...")
+        self.db.init_db()
         faculty_list = self.db.get_all_faculty()
         
         if not faculty_list:
@@ -41,17 +110,28 @@ class TFIDFEmbeddingGenerator:
         logger.info("Fitting TF-IDF Vectorizer and transforming corpus...")
         tfidf_matrix = self.vectorizer.fit_transform(corpus)
         
-        with open(VECTORIZER_PATH, 'wb') as f:
+        # Write then rename so running recommenders never load a half-written vectorizer
+        os.makedirs(os.path.dirname(VECTORIZER_PATH), exist_ok=True)
+        tmp_path = f"{VECTORIZER_PATH}.tmp"
+        with open(tmp_path, 'wb') as f:
             pickle.dump(self.vectorizer, f)
+        os.replace(tmp_path, VECTORIZER_PATH)
         logger.info(f"Fitted vectorizer saved to {VECTORIZER_PATH}")
+        export_query_vectorizer(VECTORIZER_PATH, QUERY_VECTORIZER_PATH, self.vectorizer)
 
+        fingerprint = vectorizer_fingerprint(self.vectorizer)
         logger.info(f"Storing {len(faculty_list)} TF-IDF vectors in the database...")
-        for i, faculty in enumerate(faculty_list):
-            vector_blob = pickle.dumps(tfidf_matrix[i])
-            self.db.update_faculty_embedding(faculty['id'], vector_blob)
+        self._store_vectors(faculty_list, tfidf_matrix, fingerprint)
             
         logger.info("TF-IDF processing and storage complete.")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fit TF-IDF and store faculty embeddings.")
+    parser.add_argument("--changed-only", action="store_true", help="Only embed rows added since the last run, reusing the fitted vectorizer")
+    args = parser.parse_args()
+
     generator = TFIDFEmbeddingGenerator()
-    generator.generate_and_store_all()
+    generator.generate_and_store_all(changed_only=args.changed_only)
+    if args.changed_only:
+        # Last stage of the incremental pipeline: the crawl's change list is now fully applied
+        clear_changed_slugs()
@@ -0,0 +1,148 @@
+import logging
+import re
+from typing import Dict, Iterable, List, Mapping, Sequence, Tuple
+import numpy as np
+import scipy.sparse as sp
+from src.query_vectorizer import DEFAULT_TOKEN_PATTERN
+from src.search_index import select_top_k, top_contributing_terms
+
+logger = logging.getLogger(__name__)
+
+# Placeholder written by the processing step for missing fields
+MISSING_VALUES = ('', 'Not Provided')
+
+def tokenize(text: str, token_re: "re.Pattern", stop_words: frozenset) -> List[str]:
+    return [token for token in token_re.findall(text.lower()) if token not in stop_words]
+
+def bm25_weights(counts: sp.csr_matrix, k1: float, b: float) -> sp.csr_matrix:
+    # Per-entry BM25 impact (idf * saturated tf), so a query score is a column sum over the query terms
+    counts = sp.csr_matrix(counts, dtype=np.float32)
+    n_docs = counts.shape[0]
+    row_lengths = np.diff(counts.indptr)
+    doc_lengths = np.asarray(counts.sum(axis=1)).ravel()
+    average = doc_lengths.mean() if n_docs and doc_lengths.any() else 1.0
+
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+    saturation = np.repeat(k1 * (1 - b + b * doc_lengths / average), row_lengths).astype(np.float32)
+
+    weights = counts.copy()
+    weights.data = idf[weights.indices] * weights.data * (k1 + 1) / (weights.data + saturation)
+    return weights
+
+def reciprocal_rank_fusion(rankings: Sequence[np.ndarray], weights: Sequence[float],
+                           k: int = 60) -> Tuple[np.ndarray, np.ndarray]:
+    # Each ranking is an array of ids, best first. Scores are scaled so 1.0 means first in every ranking.
+    ids = np.unique(np.concatenate([np.asarray(r, dtype=np.int64) for r in rankings]))
+    scores = np.zeros(len(ids))
+    for ranking, weight in zip(rankings, weights):
+        scores[np.searchsorted(ids, ranking)] += weight / (k + np.arange(1, len(ranking) + 1))
+    return ids, scores / (sum(weights) / (k + 1))
+
+def linear_fusion(results: Sequence[Tuple[np.ndarray, np.ndarray]],
+                  weights: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+    # Each result is (ids, scores); scores are divided by their best value before the weighted sum
+    ids = np.unique(np.concatenate([np.asarray(r[0], dtype=np.int64) for r in results]))
+    scores = np.zeros(len(ids))
+    for (result_ids, result_scores), weight in zip(results, weights):
+        if len(result_scores) and result_scores.max() > 0:
+            scores[np.searchsorted(ids, result_ids)] += weight * result_scores / result_scores.max()
+    return ids, scores / sum(weights)
+
+class FieldIndex:
+    # One BM25 sub-index per field over a shared vocabulary; rows are faculty ids in ascending order
+    def __init__(self, ids: np.ndarray, terms: List[str], fields: Dict[str, sp.csr_matrix],
+                 version=None, stop_words: Iterable[str] = ()):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.terms = terms
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+        self.fields = fields
+        self.version = version
+        self.stop_words = frozenset(stop_words)
+        self._token_re = re.compile(DEFAULT_TOKEN_PATTERN)
+        self._combined: Dict[tuple, sp.csc_matrix] = {}
+
+    @classmethod
+    def from_records(cls, records: Iterable[Mapping], field_names: Sequence[str], version=None,
+                     stop_words: Iterable[str] = (), k1: float = 1.2, b: float = 0.75) -> "FieldIndex":
+        token_re = re.compile(DEFAULT_TOKEN_PATTERN)
+        stop_words = frozenset(stop_words)
+        vocabulary: Dict[str, int] = {}
+        ids = []
+        columns = {name: ([0], []) for name in field_names}
+
+        for record in records:
+            ids.append(record['id'])
+            for name in field_names:
+                indptr, indices = columns[name]
+                value = record.get(name)
+                text = '' if value is None or str(value).strip() in MISSING_VALUES else str(value)
+                indices.extend(vocabulary.setdefault(token, len(vocabulary)) for token in tokenize(text, token_re, stop_words))
+                indptr.append(len(indices))
+
+        shape = (len(ids), len(vocabulary))
+        fields = {}
+        for name, (indptr, indices) in columns.items():
+            # Repeated tokens give duplicate (row, term) entries; summing them yields term counts
+            counts = sp.csr_matrix(
+                (np.ones(len(indices), dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+                shape=shape
+            )
+            counts.sum_duplicates()
+            fields[name] = bm25_weights(counts, k1, b)
+
+        # Ids are assigned in insertion order, which dicts preserve
+        terms = list(vocabulary)
+        logger.info(f"Built field index over {len(ids)} rows, {len(terms)} terms, fields {', '.join(field_names)}.")
+        return cls(np.asarray(ids), terms, fields, version, stop_words)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def query_terms(self, query: str) -> np.ndarray:
+        found = (self.vocabulary.get(token) for token in tokenize(query, self._token_re, self.stop_words))
+        return np.unique(np.fromiter((i for i in found if i is not None), dtype=np.int64))
+
+    def weighted_matrix(self, field_weights: Mapping[str, float]) -> sp.csc_matrix:
+        # Weighted sum of the field matrices, built once per weight set; CSC so query columns slice cheaply
+        key = tuple(sorted((name, float(weight)) for name, weight in field_weights.items() if name in self.fields))
+        combined = self._combined.get(key)
+        if combined is None:
+            combined = sp.csr_matrix((len(self), len(self.terms)), dtype=np.float32)
+            for name, weight in key:
+                if weight:
+                    combined = combined + self.fields[name] * np.float32(weight)
+            combined = sp.csc_matrix(combined)
+            self._combined[key] = combined
+        return combined
+
+    def score(self, terms: np.ndarray, field_weights: Mapping[str, float]) -> np.ndarray:
+        if terms.size == 0:
+            return np.zeros(len(self))
+        return np.asarray(self.weighted_matrix(field_weights)[:, terms].sum(axis=1)).ravel()
+
+    def search(self, query: str, k: int, field_weights: Mapping[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        scores = self.score(self.query_terms(query), field_weights)
+        positions = select_top_k(scores, k)
+        return positions, scores[positions]
+
+    def positions_of(self, faculty_ids: Iterable[int]) -> np.ndarray:
+        faculty_ids = np.asarray(list(faculty_ids), dtype=np.int64)
+        positions = np.searchsorted(self.ids, faculty_ids)
+        found = positions < len(self.ids)
+        found[found] = self.ids[positions[found]] == faculty_ids[found]
+        return np.where(found, positions, -1)
+
+    def matching_terms(self, query: str, positions: np.ndarray, field_weights: Mapping[str, float],
+                       limit: int = 5) -> List[List[str]]:
+        # Query terms with the largest BM25 contribution to each row; -1 positions get no terms
+        terms = self.query_terms(query)
+        known = positions >= 0
+        matched = [[] for _ in positions]
+        if terms.size == 0 or not known.any():
+            return matched
+
+        contributions = sp.csr_matrix(self.weighted_matrix(field_weights)[positions[known]][:, terms])
+        for i, columns in zip(np.flatnonzero(known), top_contributing_terms(contributions, limit)):
+            matched[i] = [self.terms[terms[c]] for c in columns]
+        return matched
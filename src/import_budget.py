@@ -0,0 +1,49 @@
+import argparse
+import subprocess
+import sys
+from typing import Dict, Set, Tuple
+
+# Cold-import budget (cumulative `python -X importtime` microseconds -> ms) per entry point, and
+# modules that must stay off that entry point's import graph because they are loaded on first use.
+BUDGETS_MS = {
+    "app.main": 1500,
+    "app.api": 150,
+    "src.recommender": 1000,
+}
+FORBIDDEN = {
+    "app.main": ("pandas", "sklearn", "scipy", "numpy", "src.recommender"),
+    "app.api": ("pandas", "sklearn", "scipy", "numpy", "fastapi"),
+    "src.recommender": ("pandas", "sklearn"),
+}
+
+def measure(module: str) -> Tuple[float, Set[str]]:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True
+    )
+    cumulative: Dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, total, name = line[len("import time:"):].split("|")
+        if total.strip().isdigit():
+            cumulative[name.strip()] = int(total)
+    return cumulative.get(module, 0) / 1000, set(cumulative)
+
+def check(scale: float = 1.0) -> bool:
+    ok = True
+    for module, budget in BUDGETS_MS.items():
+        elapsed, imported = measure(module)
+        leaked = sorted(m for m in FORBIDDEN.get(module, ()) if m in imported)
+        within = elapsed <= budget * scale
+        status = "ok" if within and not leaked else "FAIL"
+        print(f"{status:4} {module:18} {elapsed:8.1f} ms (budget {budget * scale:.0f} ms)"
+              + (f" imports {', '.join(leaked)}" if leaked else ""))
+        ok = ok and within and not leaked
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check cold import time of the API and recommender entry points.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget, e.g. 2 on slow CI machines")
+    args = parser.parse_args()
+    sys.exit(0 if check(args.scale) else 1)
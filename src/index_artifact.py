@@ -0,0 +1,123 @@
+import json
+import logging
+import os
+import shutil
+import time
+from typing import Optional
+import numpy as np
+import scipy.sparse as sp
+from src.inverted_index import InvertedIndex
+from src.search_index import SearchIndex
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+META_FILE = "meta.json"
+POSTINGS_SUBDIR = "postings"
+MATRIX_ARRAYS = ('data', 'indices', 'indptr', 'ids')
+
+# Layout of <root>/<version>/:
+#   data.npy, indices.npy, indptr.npy  L2-normalised CSR rows (float32 / int32)
+#   ids.npy                            faculty id of each row
+#   postings/                          InvertedIndex arrays over the same rows
+#   meta.json                          embedding_version, fingerprint and shapes
+# <root>/CURRENT names the live version and is only ever replaced with os.replace.
+# The query-side vocabulary is not part of it: workers load models/query_vectorizer.npz, and the
+# fingerprint in meta.json ties the artifact to that vectorizer.
+
+def current_version(root: str) -> Optional[str]:
+    try:
+        with open(os.path.join(root, CURRENT_FILE), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def published_embedding_version(root: str) -> Optional[int]:
+    name = current_version(root)
+    if name is None:
+        return None
+    try:
+        with open(os.path.join(root, name, META_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f).get('embedding_version')
+    except (OSError, ValueError):
+        return None
+
+def write_index_artifact(root: str, index: SearchIndex, fingerprint: int, keep: int = 2) -> str:
+    name = f"{index.version}-{int(time.time() * 1000)}"
+    tmp_dir = os.path.join(root, f".{name}.tmp")
+    os.makedirs(tmp_dir)
+
+    matrix = index.matrix
+    matrix.sort_indices()
+    arrays = {
+        'data': matrix.data.astype(np.float32),
+        'indices': matrix.indices.astype(np.int32),
+        'indptr': matrix.indptr.astype(np.int32 if matrix.nnz < 2 ** 31 else np.int64),
+        'ids': index.ids,
+    }
+    for array_name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{array_name}.npy"), np.ascontiguousarray(array))
+    index.postings.save(os.path.join(tmp_dir, POSTINGS_SUBDIR))
+
+    meta = {
+        'embedding_version': index.version,
+        'fingerprint': fingerprint,
+        'n_rows': int(matrix.shape[0]),
+        'n_features': int(matrix.shape[1]),
+        'nnz': int(matrix.nnz),
+        'created_at': time.time(),
+    }
+    with open(os.path.join(tmp_dir, META_FILE), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2, sort_keys=True)
+
+    # Publish the finished directory, then flip CURRENT; readers never see a partial version
+    os.replace(tmp_dir, os.path.join(root, name))
+    current_tmp = os.path.join(root, f".{CURRENT_FILE}.tmp")
+    with open(current_tmp, 'w', encoding='utf-8') as f:
+        f.write(name)
+    os.replace(current_tmp, os.path.join(root, CURRENT_FILE))
+    logger.info(f"Published search index artifact {name} ({meta['n_rows']} rows)")
+
+    _prune_versions(root, keep)
+    return name
+
+def _prune_versions(root: str, keep: int) -> None:
+    # Processes that still map an older version keep their pages after the unlink
+    versions = sorted(
+        (entry for entry in os.scandir(root) if entry.is_dir() and not entry.name.startswith('.')),
+        key=lambda entry: entry.stat().st_mtime, reverse=True
+    )
+    live = current_version(root)
+    for entry in versions[keep:]:
+        if entry.name != live:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+def open_search_index(root: str, fingerprint: int, version) -> Optional[SearchIndex]:
+    name = current_version(root)
+    if name is None:
+        return None
+
+    path = os.path.join(root, name)
+    try:
+        with open(os.path.join(path, META_FILE), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('fingerprint') != fingerprint or meta.get('embedding_version') != version:
+            logger.info(f"Index artifact {name} does not match the database, ignoring it.")
+            return None
+
+        arrays = {array_name: np.load(os.path.join(path, f"{array_name}.npy"), mmap_mode='r') for array_name in MATRIX_ARRAYS}
+        postings = InvertedIndex.load(os.path.join(path, POSTINGS_SUBDIR))
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not open index artifact {name}: {e}")
+        return None
+
+    matrix = sp.csr_matrix(
+        (arrays['data'], arrays['indices'], arrays['indptr']),
+        shape=(meta['n_rows'], meta['n_features']), copy=False
+    )
+    if postings is None or matrix.nnz != meta['nnz'] or not np.array_equal(postings.ids, arrays['ids']):
+        logger.warning(f"Index artifact {name} is incomplete, ignoring it.")
+        return None
+
+    logger.info(f"Memory-mapped search index artifact {name} ({meta['n_rows']} vectors).")
+    return SearchIndex(matrix, arrays['ids'], version, postings, normalized=True, source=path)
@@ -1,31 +1,55 @@
 import pandas as pd
+import argparse
 import logging
 import os
 import sys
-from src.config import PROCESSED_DATA_DIR, DATABASE_PATH
+from typing import Iterator, List, Optional, Set
+from src.config import PROCESSED_DATA_DIR, DATABASE_PATH, INGEST_CHUNK_SIZE
+from src.crawl_manifest import changed_source_files
 from src.database import DatabaseManager
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-def ingest_data():
+def read_records(csv_path: str, chunk_size: int = INGEST_CHUNK_SIZE,
+                 only_sources: Optional[Set[str]] = None) -> Iterator[List[dict]]:
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_size, dtype=str):
+        chunk['university'] = 'DA-IICT'
+        if 'raw_source_file' not in chunk.columns:
+            chunk['raw_source_file'] = 'Unknown'
+        if only_sources is not None:
+            chunk = chunk[chunk['raw_source_file'].isin(only_sources)]
+
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        yield chunk.to_dict(orient='records')
+
+def ingest_data(changed_only: bool = False, chunk_size: int = INGEST_CHUNK_SIZE):
     csv_path = os.path.join(PROCESSED_DATA_DIR, 'faculty_data.csv')
     
     if not os.path.exists(csv_path):
         logger.error(f"Processed data file not found at {csv_path}.")
         return
 
-    df = pd.read_csv(csv_path)
-    df['university'] = 'DA-IICT'
-    
-    if 'raw_source_file' not in df.columns:
-        df['raw_source_file'] = 'Unknown'
+    # Profiles are keyed on their source file; older CSVs without it fall back to email
+    header = pd.read_csv(csv_path, nrows=0).columns
+    key = 'raw_source_file' if 'raw_source_file' in header else 'email'
 
-    records = df.to_dict(orient='records')
+    changes = changed_source_files() if changed_only else None
     db_manager = DatabaseManager(DATABASE_PATH)
     db_manager.init_db()
-    db_manager.clear_table()
-    db_manager.insert_faculty_bulk(records)
+
+    if changes is None:
+        return db_manager.upsert_faculty_stream(read_records(csv_path, chunk_size), key=key, delete_missing=True)
+
+    return db_manager.upsert_faculty_stream(
+        read_records(csv_path, chunk_size, only_sources=set(changes['changed'])),
+        key=key,
+        delete_keys=changes['removed'] if key == 'raw_source_file' else None
+    )
 
 if __name__ == "__main__":
-    ingest_data()
+    parser = argparse.ArgumentParser(description="Load the processed CSV into SQLite.")
+    parser.add_argument("--changed-only", action="store_true", help="Only upsert profiles changed in the last crawl")
+    parser.add_argument("--chunk-size", type=int, default=INGEST_CHUNK_SIZE, help="CSV rows read per chunk")
+    args = parser.parse_args()
+    ingest_data(changed_only=args.changed_only, chunk_size=args.chunk_size)
@@ -0,0 +1,79 @@
+import json
+import logging
+import os
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+import scipy.sparse as sp
+
+logger = logging.getLogger(__name__)
+
+ARRAYS = ('indptr', 'rows', 'weights', 'max_weights', 'ids')
+META_FILE = 'meta.json'
+
+class InvertedIndex:
+    # Term id -> (row positions, weights) stored as one CSC-style set of flat arrays
+    def __init__(self, indptr: np.ndarray, rows: np.ndarray, weights: np.ndarray,
+                 max_weights: np.ndarray, ids: np.ndarray, meta: Optional[Dict[str, Any]] = None):
+        self.indptr = indptr
+        self.rows = rows
+        self.weights = weights
+        self.max_weights = max_weights
+        self.ids = ids
+        self.meta = meta or {}
+
+    @classmethod
+    def from_matrix(cls, matrix: sp.csr_matrix, ids: np.ndarray, meta: Optional[Dict[str, Any]] = None) -> "InvertedIndex":
+        csc = sp.csc_matrix(matrix, dtype=np.float32)
+        csc.sort_indices()
+        max_weights = np.zeros(csc.shape[1], dtype=np.float32)
+        lengths = np.diff(csc.indptr)
+        non_empty = lengths > 0
+        if non_empty.any():
+            max_weights[non_empty] = np.maximum.reduceat(csc.data, csc.indptr[:-1][non_empty])
+
+        meta = dict(meta or {}, n_rows=int(csc.shape[0]), n_features=int(csc.shape[1]), nnz=int(csc.nnz))
+        return cls(csc.indptr.astype(np.int64), csc.indices.astype(np.int32), csc.data,
+                   max_weights, np.asarray(ids, dtype=np.int64), meta)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.indptr) - 1
+
+    def postings(self, term: int) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self.indptr[term], self.indptr[term + 1]
+        return self.rows[start:end], self.weights[start:end]
+
+    def save(self, directory: str) -> None:
+        os.makedirs(directory, exist_ok=True)
+        for name in ARRAYS:
+            path = os.path.join(directory, f"{name}.npy")
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                np.save(f, np.ascontiguousarray(getattr(self, name)))
+            os.replace(tmp_path, path)
+
+        # The metadata goes last: a reader that sees it knows the arrays it describes are complete
+        meta_path = os.path.join(directory, META_FILE)
+        with open(f"{meta_path}.tmp", 'w', encoding='utf-8') as f:
+            json.dump(self.meta, f, indent=2, sort_keys=True)
+        os.replace(f"{meta_path}.tmp", meta_path)
+        logger.info(f"Saved posting lists for {self.meta.get('n_rows')} rows to {directory}")
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = 'r') -> Optional["InvertedIndex"]:
+        meta_path = os.path.join(directory, META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in ARRAYS}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load posting lists from {directory}: {e}")
+            return None
+
+        index = cls(meta=meta, **arrays)
+        if len(index.rows) != meta.get('nnz') or len(index.ids) != meta.get('n_rows'):
+            logger.warning(f"Posting lists in {directory} do not match their metadata, ignoring them.")
+            return None
+        return index
@@ -0,0 +1,35 @@
+import logging
+import os
+import pickle
+from src.database import DatabaseManager
+from src.config import DATABASE_PATH, VECTORIZER_PATH
+from src.vector_codec import encode_vector, is_encoded, vectorizer_fingerprint
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def migrate_embeddings(db_path: str = DATABASE_PATH, vectorizer_path: str = VECTORIZER_PATH) -> int:
+    if not os.path.exists(vectorizer_path):
+        raise FileNotFoundError(f"TF-IDF vectorizer not found at {vectorizer_path}. Run src/embeddings.py first.")
+
+    with open(vectorizer_path, 'rb') as f:
+        fingerprint = vectorizer_fingerprint(pickle.load(f))
+
+    db = DatabaseManager(db_path)
+    db.init_db()
+    # Legacy blobs were written by our own generator, so unpickling them once here is acceptable
+    converted = db.update_faculty_embeddings_bulk(
+        (faculty_id, encode_vector(pickle.loads(blob), fingerprint))
+        for faculty_id, blob in db.get_embedding_rows()
+        if not is_encoded(blob)
+    )
+
+    if converted:
+        # Reclaim the space freed by the much smaller blobs
+        db.get_connection().execute("VACUUM")
+
+    logger.info(f"Migrated {converted} embeddings to the binary format.")
+    return converted
+
+if __name__ == "__main__":
+    migrate_embeddings()
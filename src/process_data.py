@@ -1,34 +1,88 @@
 import os
+import argparse
 import pandas as pd
 import logging
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
 from src.data_cleaner import FacultyCleaner
-from src.config import RAW_DATA_DIR, PROCESSED_DATA_DIR
+from src.crawl_manifest import changed_source_files
+from src.config import RAW_DATA_DIR, PROCESSED_DATA_DIR, PARSE_WORKERS, PARSE_CHUNK_SIZE
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def process_all_profiles():
-    os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
+def _parse_chunk(file_names: List[str]) -> List[Tuple[str, Optional[dict], Optional[str]]]:
     cleaner = FacultyCleaner()
-    all_data = []
-    
-    files = [f for f in os.listdir(RAW_DATA_DIR) if f.endswith('.html')]
-    
-    for file_name in files:
+    results = []
+    for file_name in file_names:
         file_path = os.path.join(RAW_DATA_DIR, file_name)
-        with open(file_path, 'r', encoding='utf-8') as f:
-            html = f.read()
-            data = cleaner.extract_faculty_data(html, file_name)
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                html = f.read()
+            results.append((file_name, cleaner.extract_faculty_data(html, file_name), None))
+        except Exception as e:
+            results.append((file_name, None, f"{type(e).__name__}: {e}"))
+    return results
+
+def parse_profiles(files: List[str], workers: int = PARSE_WORKERS,
+                   chunk_size: int = PARSE_CHUNK_SIZE) -> Tuple[List[dict], List[Tuple[str, str]]]:
+    chunks = [files[i:i + chunk_size] for i in range(0, len(files), chunk_size)]
+
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map() yields chunk results in submission order, so output order matches `files`
+            chunk_results = list(executor.map(_parse_chunk, chunks))
+    else:
+        chunk_results = [_parse_chunk(chunk) for chunk in chunks]
+
+    all_data = []
+    errors = []
+    for file_name, data, error in (item for chunk in chunk_results for item in chunk):
+        if error:
+            logger.error(f"Failed to parse {file_name}: {error}")
+            errors.append((file_name, error))
+        else:
             all_data.append(data)
+    return all_data, errors
+
+def process_all_profiles(changed_only: bool = False, workers: int = PARSE_WORKERS):
+    os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
+    output_path = os.path.join(PROCESSED_DATA_DIR, 'faculty_data.csv')
+
+    changes = changed_source_files() if changed_only else None
+    if changed_only and (changes is None or not os.path.exists(output_path)):
+        logger.info("No crawl change list or previous output found, processing all profiles.")
+        changes = None
+
+    if changes is None:
+        files = sorted(f for f in os.listdir(RAW_DATA_DIR) if f.endswith('.html'))
+    else:
+        files = [f for f in changes['changed'] if os.path.exists(os.path.join(RAW_DATA_DIR, f))]
+        logger.info(f"Processing {len(files)} changed profiles.")
+
+    all_data, errors = parse_profiles(files, workers)
+    if errors:
+        logger.warning(f"Skipped {len(errors)} of {len(files)} profiles due to parse errors.")
             
     df = pd.DataFrame(all_data)
-    df['name'] = df['name'].str.replace(r'\s*\(On Leave\)', '', regex=True)
-    df = df.replace(r'^\s*$', np.nan, regex=True)
-    df = df.fillna("Not Provided")
+    if not df.empty:
+        df['name'] = df['name'].str.replace(r'\s*\(On Leave\)', '', regex=True)
+        df = df.replace(r'^\s*$', np.nan, regex=True)
+        df = df.fillna("Not Provided")
+
+    if changes is not None:
+        previous = pd.read_csv(output_path, dtype=str, keep_default_na=False)
+        stale = set(changes['changed']) | set(changes['removed'])
+        previous = previous[~previous['raw_source_file'].isin(stale)]
+        df = pd.concat([previous, df], ignore_index=True)
     
-    output_path = os.path.join(PROCESSED_DATA_DIR, 'faculty_data.csv')
     df.to_csv(output_path, index=False)
+    return errors
 
 if __name__ == "__main__":
-    process_all_profiles()
+    parser = argparse.ArgumentParser(description="Parse raw faculty HTML into the processed CSV.")
+    parser.add_argument("--changed-only", action="store_true", help="Only re-parse profiles changed in the last crawl")
+    parser.add_argument("--workers", type=int, default=PARSE_WORKERS, help="Parser processes to use (1 = serial)")
+    args = parser.parse_args()
+    process_all_profiles(changed_only=args.changed_only, workers=args.workers)
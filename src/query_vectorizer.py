@@ -0,0 +1,164 @@
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Iterable, List, Optional
+import numpy as np
+import scipy.sparse as sp
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+DEFAULT_TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+
+def file_sha1(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class QueryVectorizer:
+    # Transform-only stand-in for a fitted TfidfVectorizer (word analyzer). Produces the same
+    # sparse vectors without importing scikit-learn, and loads from a plain .npz.
+    def __init__(self, terms: np.ndarray, idf: np.ndarray, stop_words: Iterable[str] = (),
+                 token_pattern: str = DEFAULT_TOKEN_PATTERN, ngram_range=(1, 1), lowercase: bool = True,
+                 norm: Optional[str] = 'l2', sublinear_tf: bool = False, source_sha1: Optional[str] = None):
+        self.terms = np.asarray(terms, dtype=str)
+        self.idf_ = np.asarray(idf, dtype=np.float64)
+        self.stop_words = frozenset(stop_words)
+        self.token_pattern = token_pattern
+        self.ngram_range = tuple(ngram_range)
+        self.lowercase = lowercase
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+        self.source_sha1 = source_sha1
+
+        # Vocabulary lookup is a binary search over the sorted terms, mapped back to column ids
+        order = np.argsort(self.terms, kind='stable')
+        self._sorted_terms = self.terms[order]
+        self._columns = order.astype(np.int32)
+        self._token_re = re.compile(token_pattern)
+
+    @classmethod
+    def from_sklearn(cls, vectorizer, source_sha1: Optional[str] = None) -> "QueryVectorizer":
+        unsupported = {
+            'analyzer': 'word', 'preprocessor': None, 'tokenizer': None, 'strip_accents': None,
+            'binary': False, 'use_idf': True, 'input': 'content',
+        }
+        params = vectorizer.get_params()
+        for name, expected in unsupported.items():
+            if params.get(name) != expected:
+                raise ValueError(f"Cannot convert vectorizer with {name}={params.get(name)!r}")
+        if params['norm'] not in ('l2', None):
+            raise ValueError(f"Cannot convert vectorizer with norm={params['norm']!r}")
+
+        return cls(
+            vectorizer.get_feature_names_out(), vectorizer.idf_,
+            stop_words=vectorizer.get_stop_words() or (),
+            token_pattern=params['token_pattern'], ngram_range=params['ngram_range'],
+            lowercase=params['lowercase'], norm=params['norm'], sublinear_tf=params['sublinear_tf'],
+            source_sha1=source_sha1,
+        )
+
+    def get_feature_names_out(self) -> np.ndarray:
+        return self.terms
+
+    def get_stop_words(self) -> frozenset:
+        return self.stop_words
+
+    @property
+    def n_features(self) -> int:
+        return len(self.terms)
+
+    def analyze(self, text: str) -> List[str]:
+        # Same order of operations as sklearn's word analyzer: lowercase, tokenize,
+        # drop stop words, then build n-grams from the remaining tokens
+        if self.lowercase:
+            text = text.lower()
+        tokens = [token for token in self._token_re.findall(text) if token not in self.stop_words]
+        min_n, max_n = self.ngram_range
+        grams = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), max_n + 1):
+            grams.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return grams
+
+    def _columns_of(self, grams: List[str]) -> np.ndarray:
+        if not grams or not len(self._sorted_terms):
+            return np.zeros(0, dtype=np.int32)
+        grams = np.asarray(grams, dtype=str)
+        positions = np.searchsorted(self._sorted_terms, grams)
+        found = positions < len(self._sorted_terms)
+        found[found] = self._sorted_terms[positions[found]] == grams[found]
+        return self._columns[positions[found]]
+
+    def transform(self, texts: Iterable[str]) -> sp.csr_matrix:
+        indptr, indices, counts = [0], [], []
+        for text in texts:
+            columns, row_counts = np.unique(self._columns_of(self.analyze(text)), return_counts=True)
+            indices.append(columns)
+            counts.append(row_counts)
+            indptr.append(indptr[-1] + len(columns))
+
+        data = np.concatenate(counts).astype(np.float64) if counts else np.zeros(0)
+        indices = np.concatenate(indices).astype(np.int32) if indices else np.zeros(0, dtype=np.int32)
+        matrix = sp.csr_matrix((data, indices, np.asarray(indptr)), shape=(len(indptr) - 1, self.n_features))
+
+        if self.sublinear_tf:
+            np.log(matrix.data, matrix.data)
+            matrix.data += 1
+        matrix.data *= self.idf_[matrix.indices]
+        if self.norm is None:
+            return matrix
+
+        row_of = np.repeat(np.arange(matrix.shape[0]), np.diff(matrix.indptr))
+        norms = np.sqrt(np.bincount(row_of, weights=matrix.data ** 2, minlength=matrix.shape[0]))
+        norms[norms == 0] = 1.0
+        matrix.data /= np.repeat(norms, np.diff(matrix.indptr))
+        return matrix
+
+    def save(self, path: str) -> None:
+        config = {
+            'format_version': FORMAT_VERSION,
+            'token_pattern': self.token_pattern,
+            'ngram_range': list(self.ngram_range),
+            'lowercase': self.lowercase,
+            'norm': self.norm,
+            'sublinear_tf': self.sublinear_tf,
+            'source_sha1': self.source_sha1,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, terms=self.terms, idf=self.idf_,
+                                stop_words=np.asarray(sorted(self.stop_words), dtype=str),
+                                config=np.asarray(json.dumps(config)))
+        os.replace(tmp_path, path)
+        logger.info(f"Saved query vectorizer ({self.n_features} features) to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> "QueryVectorizer":
+        with np.load(path, allow_pickle=False) as arrays:
+            config = json.loads(str(arrays['config']))
+            if config.get('format_version') != FORMAT_VERSION:
+                raise ValueError(f"Unsupported query vectorizer format {config.get('format_version')} in {path}")
+            return cls(
+                arrays['terms'], arrays['idf'], stop_words=arrays['stop_words'].tolist(),
+                token_pattern=config['token_pattern'], ngram_range=config['ngram_range'],
+                lowercase=config['lowercase'], norm=config['norm'], sublinear_tf=config['sublinear_tf'],
+                source_sha1=config.get('source_sha1'),
+            )
+
+def export_query_vectorizer(vectorizer_path: str, output_path: str, vectorizer=None) -> QueryVectorizer:
+    if vectorizer is None:
+        import pickle
+        with open(vectorizer_path, 'rb') as f:
+            vectorizer = pickle.load(f)
+    query_vectorizer = QueryVectorizer.from_sklearn(vectorizer, source_sha1=file_sha1(vectorizer_path))
+    query_vectorizer.save(output_path)
+    return query_vectorizer
+
+if __name__ == "__main__":
+    from src.config import VECTORIZER_PATH, QUERY_VECTORIZER_PATH
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    export_query_vectorizer(VECTORIZER_PATH, QUERY_VECTORIZER_PATH)
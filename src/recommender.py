@@ -1,80 +1,264 @@
 import logging
-import pickle
 import os
-import re
+import threading
 import numpy as np
-from sklearn.metrics.pairwise import cosine_similarity
 from src.database import DatabaseManager
-from src.config import DATABASE_PATH, BASE_DIR, VECTORIZER_PATH
+from src.search_index import SearchIndex, select_top_k, top_contributing_terms
+from src.hybrid_ranking import FieldIndex, linear_fusion, reciprocal_rank_fusion
+from src.index_artifact import current_version, open_search_index
+from src.query_cache import QueryCache
+from src.synonyms import SynonymExpander
+from src.query_vectorizer import QueryVectorizer, file_sha1
+from src.vector_codec import vectorizer_fingerprint
+from src.config import DATABASE_PATH, BASE_DIR, VECTORIZER_PATH, QUERY_VECTORIZER_PATH, INDEX_DIR, SYNONYMS_PATH, QUERY_CACHE_SIZE, QUERY_CACHE_TTL
+from src.config import FIELD_WEIGHTS, BM25_K1, BM25_B, HYBRID_FUSION, HYBRID_COSINE_WEIGHT, HYBRID_BM25_WEIGHT, RRF_K, HYBRID_DEPTH
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+VECTORIZER_FILES = (VECTORIZER_PATH, QUERY_VECTORIZER_PATH)
+
+def _vectorizer_mtimes() -> tuple:
+    return tuple(os.path.getmtime(path) if os.path.exists(path) else None for path in VECTORIZER_FILES)
+
+def copy_results(results: list) -> list:
+    # Cached results are shared, so callers get their own dicts and keyword lists
+    return [dict(faculty, matching_keywords=list(faculty['matching_keywords'])) for faculty in results]
+
+def display_score(similarity: float) -> float:
+    return min(round(similarity * 150 + 40, 1), 99.0) if similarity > 0.05 else round(similarity * 200, 1)
+
 class FacultyRecommender:
     def __init__(self):
         self.db = DatabaseManager(DATABASE_PATH)
-        if not os.path.exists(VECTORIZER_PATH):
+        if not any(os.path.exists(path) for path in VECTORIZER_FILES):
             raise FileNotFoundError(f"TF-IDF vectorizer not found at {VECTORIZER_PATH}. Run src/embeddings.py first.")
         
-        with open(VECTORIZER_PATH, 'rb') as f:
-            self.vectorizer = pickle.load(f)
+        self.vectorizer_mtime = _vectorizer_mtimes()
+        self.vectorizer = self._load_vectorizer()
+        self.fingerprint = vectorizer_fingerprint(self.vectorizer)
+        self.feature_names = self.vectorizer.get_feature_names_out()
             
-        self.synonyms = {
-            "dl": "deep learning",
-            "ml": "machine learning",
-            "nlp": "natural language processing",
-            "ai": "artificial intelligence",
-            "cv": "computer vision",
-            "iot": "internet of things",
-            "vlsi": "very large scale integration"
-        }
+        self.expander = SynonymExpander.from_file(SYNONYMS_PATH)
+        self.synonyms = self.expander.synonyms
+
+        self._index_lock = threading.Lock()
+        self.index = self._build_index()
+        self._field_lock = threading.Lock()
+        self.field_index = None
+        # A new recommender (e.g. after a vectorizer swap) always starts with an empty cache
+        self.cache = QueryCache(QUERY_CACHE_SIZE, QUERY_CACHE_TTL)
             
         logger.info("TF-IDF Recommender initialized with expansion rules.")
 
+    @staticmethod
+    def _load_vectorizer():
+        # The exported QueryVectorizer loads in milliseconds and does not import scikit-learn;
+        # the pickle is only used when the export is missing or was made from another pickle.
+        if os.path.exists(QUERY_VECTORIZER_PATH):
+            query_vectorizer = QueryVectorizer.load(QUERY_VECTORIZER_PATH)
+            if not os.path.exists(VECTORIZER_PATH) or query_vectorizer.source_sha1 == file_sha1(VECTORIZER_PATH):
+                return query_vectorizer
+            logger.warning(f"{QUERY_VECTORIZER_PATH} is out of date, run `python -m src.query_vectorizer`. Using the pickle.")
+
+        import pickle
+        with open(VECTORIZER_PATH, 'rb') as f:
+            return pickle.load(f)
+
+    def is_stale(self) -> bool:
+        try:
+            return _vectorizer_mtimes() != self.vectorizer_mtime
+        except OSError:
+            return True
+
+    def _build_index(self) -> SearchIndex:
+        version = self.db.get_embedding_version()
+        self._seen_artifact = current_version(INDEX_DIR)
+        # Prefer the published artifact: it is memory-mapped, so every worker process shares one copy
+        index = open_search_index(INDEX_DIR, self.fingerprint, version)
+        if index is not None:
+            return index
+
+        n_features = len(self.feature_names)
+        return SearchIndex.from_rows(self.db.get_embedding_rows(), n_features, self.fingerprint, version)
+
+    def _needs_rebuild(self, index: SearchIndex) -> bool:
+        if self.db.get_embedding_version() != index.version:
+            return True
+        if index.source is None:
+            # A private in-memory copy is swapped for the shared artifact once a new one is published
+            published = current_version(INDEX_DIR)
+            return published is not None and published != self._seen_artifact
+        return False
+
+    def _ensure_fresh_index(self) -> SearchIndex:
+        index = self.index
+        if not self._needs_rebuild(index):
+            return index
+
+        with self._index_lock:
+            if self._needs_rebuild(self.index):
+                logger.info("Embeddings changed on disk, rebuilding search index.")
+                self.index = self._build_index()
+                self.cache.clear()
+            return self.index
+
+    def _ensure_field_index(self) -> FieldIndex:
+        # Built on the first hybrid search from the row text, so it follows row_version rather than the vectors
+        version = self.db.get_row_version()
+        field_index = self.field_index
+        if field_index is not None and field_index.version == version:
+            return field_index
+
+        with self._field_lock:
+            if self.field_index is None or self.field_index.version != version:
+                records = self.db.iter_faculty(['id', *FIELD_WEIGHTS])
+                self.field_index = FieldIndex.from_records(
+                    records, list(FIELD_WEIGHTS), version,
+                    self.vectorizer.get_stop_words() or (), BM25_K1, BM25_B
+                )
+            return self.field_index
+
     def _expand_query(self, query: str) -> str:
-        expanded = query.lower()
-        # Ensure we only replace whole words (e.g., 'dl' but not 'idle')
-        for shortcut, full_term in self.synonyms.items():
-            pattern = re.compile(rf'\b{shortcut}\b', re.IGNORECASE)
-            expanded = pattern.sub(full_term, expanded)
-        return expanded
+        # Only whole words are replaced (e.g., 'dl' but not 'idle')
+        return self.expander.expand(query)
+
+    def _term_names(self, columns) -> list:
+        return [str(self.feature_names[c]) for c in columns]
 
     def get_keywords(self, query: str, faculty_bio: str) -> list:
-        expanded = self._expand_query(query)
-        query_words = set(expanded.lower().split())
-        bio_words = set(faculty_bio.lower().replace('.', ' ').replace(',', ' ').split())
-        
-        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
-        common = query_words.intersection(bio_words)
-        keywords = [word for word in common if word not in ENGLISH_STOP_WORDS and len(word) > 2]
-        return list(keywords)[:5]
+        vectors = self.vectorizer.transform([self._expand_query(query), faculty_bio])
+        contributions = vectors[0].multiply(vectors[1]).tocsr()
+        return self._term_names(top_contributing_terms(contributions, 5)[0])
+
+    def recommend(self, query: str, top_n: int = 10, min_score: float = 0.0):
+        # min_score is a cosine similarity cutoff (0-1), applied before any row is loaded
+        expanded_query = " ".join(self._expand_query(query).split())
+        index = self._ensure_fresh_index()
+
+        # Results carry row data, so the key follows row edits as well as the vectors
+        cache_key = (expanded_query, top_n, min_score, index.version, self.db.get_row_version())
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return copy_results(cached)
 
-    def recommend(self, query: str, top_n: int = 10):
-        expanded_query = self._expand_query(query)
         query_vector = self.vectorizer.transform([expanded_query])
-        
-        all_faculty = self.db.get_all_faculty()
+        positions, scores = index.search(query_vector, top_n, min_score)
+        records = self.db.get_faculty_by_ids(index.ids[positions])
+        results = self._build_results(index, query_vector, positions, scores, records)
+
+        self.cache.put(cache_key, results)
+        return copy_results(results)
+
+    def recommend_hybrid(self, query: str, top_n: int = 10, min_score: float = 0.0,
+                         fusion: str = HYBRID_FUSION, field_weights: dict = None):
+        # Fuses the cosine ranking with field-weighted BM25. match_score is the fused score as a
+        # percentage (100 = ranked first by both), and min_score (0-1) is a cutoff on that score.
+        field_weights = dict(field_weights or FIELD_WEIGHTS)
+        expanded_query = " ".join(self._expand_query(query).split())
+        index = self._ensure_fresh_index()
+        field_index = self._ensure_field_index()
+
+        cache_key = ('hybrid', expanded_query, top_n, min_score, fusion, tuple(sorted(field_weights.items())),
+                     index.version, field_index.version)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return copy_results(cached)
+
+        depth = max(top_n, HYBRID_DEPTH)
+        cosine_positions, cosine_scores = index.search(self.vectorizer.transform([expanded_query]), depth)
+        bm25_positions, bm25_scores = field_index.search(expanded_query, depth, field_weights)
+        weights = (HYBRID_COSINE_WEIGHT, HYBRID_BM25_WEIGHT)
+        if fusion == "rrf":
+            ids, fused = reciprocal_rank_fusion([index.ids[cosine_positions], field_index.ids[bm25_positions]], weights, RRF_K)
+        elif fusion == "linear":
+            ids, fused = linear_fusion([
+                (index.ids[cosine_positions], cosine_scores), (field_index.ids[bm25_positions], bm25_scores)
+            ], weights)
+        else:
+            raise ValueError(f"Unknown fusion method: {fusion}")
+
+        selected = select_top_k(fused, top_n, min_score)
+        ids, fused = ids[selected], fused[selected]
+        records = self.db.get_faculty_by_ids(ids)
+        matched_terms = field_index.matching_terms(expanded_query, field_index.positions_of(ids), field_weights)
+
         results = []
-        
-        for faculty in all_faculty:
-            if faculty.get('embedding'):
-                faculty_vector = pickle.loads(faculty['embedding'])
-                
-                similarity = cosine_similarity(query_vector, faculty_vector)[0][0]
-                
-                if similarity > 0:
-                    display_score = min(round(similarity * 150 + 40, 1), 99.0) if similarity > 0.05 else round(similarity * 200, 1)
-                    
-                    keywords = self.get_keywords(query, f"{faculty['specialization']} {faculty['biography']}")
-                    
-                    faculty_data = faculty.copy()
-                    faculty_data['match_score'] = display_score
-                    faculty_data['matching_keywords'] = keywords
-                    faculty_data.pop('embedding', None)
-                    results.append(faculty_data)
-        
-        results.sort(key=lambda x: x['match_score'], reverse=True)
-        return results[:top_n]
+        for faculty_id, score, terms in zip(ids, fused, matched_terms):
+            record = records.get(int(faculty_id))
+            if not record:
+                continue
+
+            faculty = dict(record)
+            faculty['match_score'] = round(float(score) * 100, 1)
+            faculty['matching_keywords'] = terms
+            results.append(faculty)
+
+        self.cache.put(cache_key, results)
+        return copy_results(results)
+
+    def recommend_batch(self, queries: list, top_n: int = 10, min_score: float = 0.0) -> list:
+        index = self._ensure_fresh_index()
+        expanded = [" ".join(self._expand_query(query).split()) for query in queries]
+        row_version = self.db.get_row_version()
+        results = {text: self.cache.get((text, top_n, min_score, index.version, row_version)) for text in expanded}
+        pending = [text for text, cached in results.items() if cached is None]
+
+        if pending:
+            query_matrix = self.vectorizer.transform(pending)
+            selections = index.search_batch(query_matrix, top_n, min_score)
+            # Every selected row for the whole batch is loaded with one query
+            selected_ids = np.concatenate([index.ids[positions] for positions, _ in selections])
+            records = self.db.get_faculty_by_ids(selected_ids)
+
+            for i, text in enumerate(pending):
+                positions, scores = selections[i]
+                results[text] = self._build_results(index, query_matrix[i], positions, scores, records)
+                self.cache.put((text, top_n, min_score, index.version, row_version), results[text])
+
+        return [copy_results(results[text]) for text in expanded]
+
+    def _build_results(self, index: SearchIndex, query_vector, positions, scores, records: dict) -> list:
+        # Explanations are only computed for the rows we return
+        matched_terms = index.matching_terms(query_vector, positions)
+        results = []
+
+        for position, similarity, terms in zip(positions, scores, matched_terms):
+            record = records.get(int(index.ids[position]))
+            if not record:
+                continue
+
+            faculty = dict(record)
+            faculty['match_score'] = display_score(float(similarity))
+            faculty['matching_keywords'] = self._term_names(terms)
+            results.append(faculty)
+
+        return results
+
+    def similar(self, faculty_id: int, top_n: int = 10) -> list:
+        neighbors = self.db.get_neighbors(faculty_id, top_n)
+        if not neighbors:
+            # Lists not generated yet: fall back to a one-off search with the faculty's own vector
+            neighbors = self._similar_from_index(faculty_id, top_n)
+
+        for faculty in neighbors:
+            faculty['match_score'] = display_score(faculty.pop('similarity'))
+        return neighbors
+
+    def _similar_from_index(self, faculty_id: int, top_n: int) -> list:
+        index = self._ensure_fresh_index()
+        position = index.positions_of([faculty_id])
+        if position.size == 0:
+            return []
+
+        positions, scores = index.search(index.matrix[position], top_n + 1)
+        keep = positions != position[0]
+        positions, scores = positions[keep][:top_n], scores[keep][:top_n]
+        records = self.db.get_faculty_by_ids(index.ids[positions])
+        return [
+            dict(records[int(index.ids[p])], similarity=float(score))
+            for p, score in zip(positions, scores) if int(index.ids[p]) in records
+        ]
 
 if __name__ == "__main__":
     recommender = FacultyRecommender()
@@ -1,15 +1,22 @@
 import requests
 from bs4 import BeautifulSoup
+import argparse
+import asyncio
 import time
 import os
 from typing import List, Dict, Optional
+from urllib.parse import urlsplit
 from tenacity import retry, stop_after_attempt, wait_exponential
 import logging
 
 try:
-    from .config import HEADERS, REQUEST_DELAY, MAX_RETRIES, TIMEOUT, RAW_DATA_DIR, FACULTY_URLS
+    from .crawl_manifest import CrawlManifest, write_changed_slugs
+    from .config import (HEADERS, REQUEST_DELAY, MAX_RETRIES, TIMEOUT, RAW_DATA_DIR, FACULTY_URLS,
+                         MAX_CONCURRENCY_PER_HOST, RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
 except ImportError:
-    from config import HEADERS, REQUEST_DELAY, MAX_RETRIES, TIMEOUT, RAW_DATA_DIR, FACULTY_URLS
+    from crawl_manifest import CrawlManifest, write_changed_slugs
+    from config import (HEADERS, REQUEST_DELAY, MAX_RETRIES, TIMEOUT, RAW_DATA_DIR, FACULTY_URLS,
+                        MAX_CONCURRENCY_PER_HOST, RATE_LIMIT_PER_SECOND, RATE_LIMIT_BURST)
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -19,18 +26,25 @@ class FacultyScraper:
         self.session = requests.Session()
         self.session.headers.update(HEADERS)
         os.makedirs(RAW_DATA_DIR, exist_ok=True)
+        self.manifest = CrawlManifest()
+        self.seen_slugs = set()
+        self.changed_slugs = []
     
     @retry(stop=stop_after_attempt(MAX_RETRIES), wait=wait_exponential(multiplier=1, min=4, max=10))
-    def fetch_page(self, url: str) -> Optional[str]:
+    def fetch_response(self, url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
         try:
             logger.info(f"Fetching: {url}")
-            response = self.session.get(url, timeout=TIMEOUT)
-            response.raise_for_status()
+            response = self.session.get(url, headers=headers, timeout=TIMEOUT)
+            if response.status_code != 304:
+                response.raise_for_status()
             time.sleep(REQUEST_DELAY)
-            return response.text
+            return response
         except requests.RequestException as e:
             logger.error(f"Error fetching {url}: {e}")
             raise
+
+    def fetch_page(self, url: str) -> Optional[str]:
+        return self.fetch_response(url).text
     
     def extract_profile_links(self, html: str, base_url: str) -> List[str]:
         soup = BeautifulSoup(html, 'lxml')
@@ -58,11 +72,29 @@ class FacultyScraper:
                     profile_links.append(full_url)
         return profile_links
     
+    def _directory_links(self, directory_url: str, status_code: int, headers, html: str) -> List[str]:
+        if status_code == 304:
+            logger.info(f"Directory unchanged: {directory_url}")
+            return self.manifest.cached_links(directory_url)
+        if not html:
+            return []
+        links = self.extract_profile_links(html, directory_url)
+        self.manifest.record_directory(directory_url, headers, html, links)
+        return links
+
+    def _store_profile(self, slug: str, profile_url: str, status_code: int, headers, html: str) -> Optional[str]:
+        if status_code == 304 or not html:
+            return None
+        changed = self.manifest.record_profile(slug, profile_url, headers, html)
+        # A missing raw file was fetched without validators precisely to restore it, even if the body is unchanged
+        if changed or not os.path.exists(os.path.join(RAW_DATA_DIR, f"{slug}.html")):
+            self.save_raw_html(html, slug)
+            self.changed_slugs.append(slug)
+        return html
+
     def scrape_faculty_directory(self, directory_url: str) -> List[str]:
-        html = self.fetch_page(directory_url)
-        if html:
-            return self.extract_profile_links(html, directory_url)
-        return []
+        response = self.fetch_response(directory_url, self.manifest.directory_headers(directory_url))
+        return self._directory_links(directory_url, response.status_code, response.headers, response.text)
     
     def fetch_profile_html(self, profile_url: str) -> Optional[str]:
         return self.fetch_page(profile_url)
@@ -82,11 +114,120 @@ class FacultyScraper:
     
     def scrape_profile_details(self, profile_url: str) -> Optional[str]:
         slug = profile_url.rstrip('/').split('/')[-1]
-        html = self.fetch_profile_html(profile_url)
-        if html:
-            self.save_raw_html(html, slug)
-            return html
-        return None
+        self.seen_slugs.add(slug)
+        response = self.fetch_response(profile_url, self.manifest.profile_headers(slug))
+        return self._store_profile(slug, profile_url, response.status_code, response.headers, response.text)
+
+    def finish_crawl(self) -> Dict[str, List[str]]:
+        removed = self.manifest.prune(self.seen_slugs)
+        for slug in removed:
+            path = os.path.join(RAW_DATA_DIR, f"{slug}.html")
+            if os.path.exists(path):
+                os.remove(path)
+        self.manifest.save()
+        write_changed_slugs(self.changed_slugs, removed)
+        return {'changed': sorted(set(self.changed_slugs)), 'removed': removed}
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class AsyncFacultyScraper(FacultyScraper):
+    def __init__(self, max_per_host: int = MAX_CONCURRENCY_PER_HOST,
+                 rate: float = RATE_LIMIT_PER_SECOND, burst: int = RATE_LIMIT_BURST):
+        super().__init__()
+        self.max_per_host = max_per_host
+        self.rate = rate
+        self.burst = burst
+        self.client = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._host_buckets: Dict[str, TokenBucket] = {}
+
+    async def __aenter__(self):
+        import httpx
+        self.client = httpx.AsyncClient(
+            headers=HEADERS,
+            timeout=TIMEOUT,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.max_per_host * len(FACULTY_URLS),
+                                max_keepalive_connections=self.max_per_host)
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.client.aclose()
+        self.client = None
+
+    def _host_limits(self, url: str):
+        host = urlsplit(url).netloc
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.max_per_host)
+            self._host_buckets[host] = TokenBucket(self.rate, self.burst)
+        return self._host_slots[host], self._host_buckets[host]
+
+    @retry(stop=stop_after_attempt(MAX_RETRIES), wait=wait_exponential(multiplier=1, min=4, max=10))
+    async def fetch_response_async(self, url: str, headers: Optional[Dict[str, str]] = None):
+        import httpx
+        slots, bucket = self._host_limits(url)
+        async with slots:
+            await bucket.acquire()
+            try:
+                logger.info(f"Fetching: {url}")
+                response = await self.client.get(url, headers=headers)
+                if response.status_code != 304:
+                    response.raise_for_status()
+                return response
+            except httpx.HTTPError as e:
+                logger.error(f"Error fetching {url}: {e}")
+                raise
+
+    async def scrape_faculty_directory_async(self, directory_url: str) -> List[str]:
+        response = await self.fetch_response_async(directory_url, self.manifest.directory_headers(directory_url))
+        return self._directory_links(directory_url, response.status_code, response.headers, response.text)
+
+    async def scrape_all_directories_async(self) -> Dict[str, List[str]]:
+        link_lists = await asyncio.gather(*(self.scrape_faculty_directory_async(url) for url in FACULTY_URLS))
+        return {url.split('/')[-1]: links for url, links in zip(FACULTY_URLS, link_lists)}
+
+    async def scrape_profile_details_async(self, profile_url: str) -> Optional[str]:
+        slug = profile_url.rstrip('/').split('/')[-1]
+        self.seen_slugs.add(slug)
+        response = await self.fetch_response_async(profile_url, self.manifest.profile_headers(slug))
+        return self._store_profile(slug, profile_url, response.status_code, response.headers, response.text)
+
+    async def scrape_profiles_async(self, profile_urls: List[str]) -> int:
+        unique_urls = list(dict.fromkeys(profile_urls))
+        outcomes = await asyncio.gather(
+            *(self.scrape_profile_details_async(url) for url in unique_urls),
+            return_exceptions=True
+        )
+        for url, outcome in zip(unique_urls, outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"Giving up on {url}: {outcome}")
+        return sum(1 for outcome in outcomes if not isinstance(outcome, Exception))
+
+async def async_main(max_per_host: int = MAX_CONCURRENCY_PER_HOST, rate: float = RATE_LIMIT_PER_SECOND):
+    async with AsyncFacultyScraper(max_per_host=max_per_host, rate=rate) as scraper:
+        all_profiles = await scraper.scrape_all_directories_async()
+        profile_urls = [url for profiles in all_profiles.values() for url in profiles]
+        scraped_count = await scraper.scrape_profiles_async(profile_urls)
+        scraper.finish_crawl()
+    logger.info(f"Scraped {scraped_count} of {len(set(profile_urls))} profiles.")
 
 def main():
     scraper = FacultyScraper()
@@ -97,6 +238,16 @@ def main():
         for profile_url in profiles:
             scraper.scrape_profile_details(profile_url)
             scraped_count += 1
+    scraper.finish_crawl()
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Scrape DA-IICT faculty profiles.")
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Fetch pages concurrently")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENCY_PER_HOST, help="Max in-flight requests per host")
+    parser.add_argument("--rate", type=float, default=RATE_LIMIT_PER_SECOND, help="Max requests per second per host")
+    args = parser.parse_args()
+
+    if args.use_async:
+        asyncio.run(async_main(args.concurrency, args.rate))
+    else:
+        main()
@@ -0,0 +1,148 @@
+import logging
+from typing import List, Tuple, Iterable, Iterator, Optional
+import numpy as np
+import scipy.sparse as sp
+from src.vector_codec import decode_matrix
+from src.inverted_index import InvertedIndex
+
+logger = logging.getLogger(__name__)
+
+# Relative slack on MaxScore bounds so float32 rounding never prunes a row that ties the threshold
+BOUND_SLACK = 1e-5
+
+def l2_normalize_rows(matrix: sp.csr_matrix) -> sp.csr_matrix:
+    dtype = matrix.dtype if matrix.dtype in (np.float32, np.float64) else np.float64
+    matrix = sp.csr_matrix(matrix, dtype=dtype, copy=True)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    row_lengths = np.diff(matrix.indptr)
+    matrix.data /= np.repeat(norms, row_lengths)
+    return matrix
+
+def top_contributing_terms(contributions: sp.csr_matrix, limit: int) -> List[np.ndarray]:
+    terms = []
+    for i in range(contributions.shape[0]):
+        start, end = contributions.indptr[i], contributions.indptr[i + 1]
+        columns = contributions.indices[start:end]
+        weights = contributions.data[start:end]
+        keep = weights > 0
+        columns, weights = columns[keep], weights[keep]
+        order = np.lexsort((columns, -weights))[:limit]
+        terms.append(columns[order])
+    return terms
+
+def select_top_k(scores: np.ndarray, k: int, min_score: float = 0.0) -> np.ndarray:
+    positive = np.flatnonzero((scores > 0) & (scores >= min_score))
+    if k <= 0 or positive.size == 0:
+        return positive[:0]
+
+    if positive.size > k:
+        part = np.argpartition(-scores[positive], k - 1)[:k]
+        positive = positive[part]
+
+    return positive[np.argsort(-scores[positive], kind='stable')]
+
+class SearchIndex:
+    def __init__(self, matrix: sp.csr_matrix, ids: np.ndarray, version=None,
+                 postings: Optional[InvertedIndex] = None, normalized: bool = False,
+                 source: Optional[str] = None):
+        # normalized=True takes the matrix as is, so memory-mapped arrays are not copied
+        self.matrix = matrix if normalized else l2_normalize_rows(matrix)
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.version = version
+        # Path of the artifact the index is mapped from, None when it was built in memory
+        self.source = source
+        self.postings = postings if postings is not None else InvertedIndex.from_matrix(self.matrix, self.ids)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[int, bytes]], n_features: int,
+                  fingerprint: Optional[int] = None, version=None) -> "SearchIndex":
+        ids, matrix = decode_matrix(rows, n_features, fingerprint)
+        if matrix.shape[0] == 0:
+            matrix = sp.csr_matrix((0, n_features), dtype=np.float32)
+
+        logger.info(f"Built search index with {matrix.shape[0]} vectors ({matrix.nnz} non-zeros).")
+        return cls(matrix, ids, version)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def _score_rows(self, positions: np.ndarray, query: sp.csr_matrix) -> np.ndarray:
+        return np.asarray(self.matrix[positions] @ query.T.toarray()).ravel()
+
+    def search(self, query_vector, k: int, min_score: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+        # MaxScore over the posting lists: only rows sharing a term with the query are visited,
+        # and rows that only match low-impact terms are skipped once they cannot reach the top k.
+        query = sp.csr_matrix(l2_normalize_rows(query_vector))
+        empty = np.zeros(0, dtype=np.int64)
+        if k <= 0 or query.nnz == 0 or len(self) == 0:
+            return empty, np.zeros(0)
+
+        terms, weights = query.indices, query.data
+        bounds = weights * self.postings.max_weights[terms]
+        order = np.argsort(-bounds, kind='stable')
+        terms, bounds = terms[order], bounds[order]
+
+        # Seed the threshold with the exact scores of the rows under the strongest term
+        seed = self.postings.postings(terms[0])[0]
+        threshold = min_score
+        if seed.size >= k:
+            threshold = max(threshold, np.partition(self._score_rows(seed, query), seed.size - k)[seed.size - k])
+
+        # Terms are essential while the bounds from them onwards can still add up to the threshold
+        remaining = np.cumsum(bounds[::-1])[::-1]
+        essential = terms[remaining >= threshold * (1 - BOUND_SLACK)]
+        if essential.size == 0:
+            return empty, np.zeros(0)
+
+        candidates = np.unique(np.concatenate([self.postings.postings(t)[0] for t in essential]))
+        candidate_scores = self._score_rows(candidates, query)
+        selected = select_top_k(candidate_scores, k, min_score)
+        return candidates[selected].astype(np.int64), candidate_scores[selected]
+
+    def search_batch(self, query_matrix, k: int, min_score: float = 0.0) -> List[Tuple[np.ndarray, np.ndarray]]:
+        # One sparse product for every query; each result row only holds rows sharing a term with its query
+        scores = sp.csr_matrix(l2_normalize_rows(query_matrix) @ self.matrix.T)
+        scores.sort_indices()
+        selections = []
+        for i in range(scores.shape[0]):
+            start, end = scores.indptr[i], scores.indptr[i + 1]
+            rows, row_scores = scores.indices[start:end], scores.data[start:end]
+            selected = select_top_k(row_scores, k, min_score)
+            selections.append((rows[selected].astype(np.int64), row_scores[selected]))
+        return selections
+
+    def positions_of(self, faculty_ids: Iterable[int]) -> np.ndarray:
+        # ids are stored sorted (rows come from the database ordered by id)
+        faculty_ids = np.asarray(list(faculty_ids), dtype=np.int64)
+        positions = np.searchsorted(self.ids, faculty_ids)
+        found = positions < len(self.ids)
+        found[found] = self.ids[positions[found]] == faculty_ids[found]
+        return positions[found]
+
+    def overlapping_rows(self, positions: np.ndarray) -> np.ndarray:
+        # Rows with a non-zero similarity to any of the given rows
+        overlap = sp.csr_matrix(self.matrix @ self.matrix[positions].T)
+        return np.unique(overlap.nonzero()[0])
+
+    def neighbors(self, k: int, positions: Optional[np.ndarray] = None,
+                  block_size: int = 512) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+        # Blocked self-similarity: one sparse product per block keeps memory bounded by block_size rows
+        positions = np.arange(len(self)) if positions is None else np.asarray(positions, dtype=np.int64)
+        for start in range(0, len(positions), block_size):
+            block = positions[start:start + block_size]
+            similarities = sp.csr_matrix(self.matrix[block] @ self.matrix.T)
+            similarities.sort_indices()
+            for i, position in enumerate(block):
+                begin, end = similarities.indptr[i], similarities.indptr[i + 1]
+                rows, scores = similarities.indices[begin:end], similarities.data[begin:end]
+                others = rows != position
+                rows, scores = rows[others], scores[others]
+                selected = select_top_k(scores, k)
+                yield int(position), rows[selected].astype(np.int64), scores[selected]
+
+    def matching_terms(self, query_vector, positions: np.ndarray, limit: int = 5) -> List[np.ndarray]:
+        # Feature columns shared by the query and each selected row, strongest contribution to the score first
+        query = l2_normalize_rows(query_vector)
+        contributions = sp.csr_matrix(self.matrix[positions].multiply(query))
+        return top_contributing_terms(contributions, limit)
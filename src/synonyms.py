@@ -0,0 +1,70 @@
+import json
+import logging
+import os
+import re
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SYNONYMS = {
+    "dl": "deep learning",
+    "ml": "machine learning",
+    "nlp": "natural language processing",
+    "ai": "artificial intelligence",
+    "cv": "computer vision",
+    "iot": "internet of things",
+    "vlsi": "very large scale integration"
+}
+
+WORD_PATTERN = re.compile(r"\w+")
+
+class SynonymExpander:
+    def __init__(self, synonyms: Dict[str, str]):
+        self.synonyms = {}
+        self._phrases: Dict[Tuple[str, ...], str] = {}
+        for shortcut, full_term in synonyms.items():
+            words = tuple(WORD_PATTERN.findall(shortcut.lower()))
+            if not words:
+                continue
+            self.synonyms[" ".join(words)] = full_term
+            self._phrases[words] = full_term
+        self.max_words = max((len(words) for words in self._phrases), default=0)
+
+    @classmethod
+    def from_file(cls, path: str) -> "SynonymExpander":
+        if not os.path.exists(path):
+            logger.warning(f"Synonym file not found at {path}, using built-in defaults.")
+            return cls(DEFAULT_SYNONYMS)
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def expand(self, text: str) -> str:
+        lowered = text.lower()
+        if not self._phrases:
+            return lowered
+
+        # Walk the words once; at each word try the longest multi-word shortcut first.
+        # Each attempt is a dict lookup, so cost does not grow with the dictionary size.
+        matches = list(WORD_PATTERN.finditer(lowered))
+        words = [m.group(0) for m in matches]
+        pieces = []
+        last_end = 0
+        i = 0
+        while i < len(words):
+            for n in range(min(self.max_words, len(words) - i), 0, -1):
+                full_term = self._phrases.get(tuple(words[i:i + n]))
+                if full_term is not None and self._contiguous(lowered, matches, i, n):
+                    pieces.append(lowered[last_end:matches[i].start()])
+                    pieces.append(full_term)
+                    last_end = matches[i + n - 1].end()
+                    i += n
+                    break
+            else:
+                i += 1
+        pieces.append(lowered[last_end:])
+        return "".join(pieces)
+
+    @staticmethod
+    def _contiguous(text: str, matches: list, start: int, n: int) -> bool:
+        # Multi-word shortcuts only match when their words are separated by plain whitespace
+        return all(text[matches[j].end():matches[j + 1].start()].isspace() for j in range(start, start + n - 1))
@@ -0,0 +1,101 @@
+import hashlib
+from typing import Iterable, Optional, Tuple
+import numpy as np
+import scipy.sparse as sp
+
+MAGIC = b'FFEV'
+FORMAT_VERSION = 1
+
+# Fixed 24-byte little-endian header, followed by nnz int32 column indices and nnz float32 values
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S4'),
+    ('version', '<u2'),
+    ('flags', '<u2'),
+    ('n_features', '<u4'),
+    ('fingerprint', '<u8'),
+    ('nnz', '<u4'),
+])
+HEADER_SIZE = HEADER_DTYPE.itemsize
+
+class EmbeddingFormatError(ValueError):
+    pass
+
+def vectorizer_fingerprint(vectorizer) -> int:
+    digest = hashlib.sha1()
+    digest.update("\n".join(vectorizer.get_feature_names_out()).encode('utf-8'))
+    digest.update(np.asarray(vectorizer.idf_, dtype=np.float32).tobytes())
+    return int.from_bytes(digest.digest()[:8], 'little')
+
+def is_encoded(blob: Optional[bytes]) -> bool:
+    return bool(blob) and blob[:4] == MAGIC
+
+def encode_vector(vector, fingerprint: int) -> bytes:
+    row = sp.csr_matrix(vector)
+    if row.shape[0] != 1:
+        raise ValueError(f"Expected a single row vector, got shape {row.shape}")
+    row.sort_indices()
+
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header['magic'] = MAGIC
+    header['version'] = FORMAT_VERSION
+    header['n_features'] = row.shape[1]
+    header['fingerprint'] = fingerprint
+    header['nnz'] = row.nnz
+
+    return (header.tobytes()
+            + row.indices.astype('<i4').tobytes()
+            + row.data.astype('<f4').tobytes())
+
+def _gather(buf: np.ndarray, offsets: np.ndarray, dtype: str) -> np.ndarray:
+    width = np.dtype(dtype).itemsize
+    return buf[offsets[:, None] + np.arange(width)].view(dtype).ravel()
+
+def decode_matrix(rows: Iterable[Tuple[int, bytes]], n_features: Optional[int] = None,
+                  fingerprint: Optional[int] = None) -> Tuple[np.ndarray, sp.csr_matrix]:
+    ids = []
+    blobs = []
+    for faculty_id, blob in rows:
+        if blob:
+            ids.append(faculty_id)
+            blobs.append(blob)
+
+    if not blobs:
+        return np.zeros(0, dtype=np.int64), sp.csr_matrix((0, n_features or 0), dtype=np.float32)
+
+    lengths = np.fromiter(map(len, blobs), dtype=np.int64, count=len(blobs))
+    if (lengths < HEADER_SIZE).any():
+        raise EmbeddingFormatError("Embedding blob shorter than the format header.")
+
+    buf = np.frombuffer(b''.join(blobs), dtype=np.uint8)
+    starts = np.zeros(len(blobs), dtype=np.int64)
+    np.cumsum(lengths[:-1], out=starts[1:])
+
+    headers = np.ascontiguousarray(buf[starts[:, None] + np.arange(HEADER_SIZE)]).view(HEADER_DTYPE).ravel()
+    if (headers['magic'] != MAGIC).any():
+        raise EmbeddingFormatError(
+            "Found embeddings in the legacy pickle format. Run `python -m src.migrate_embeddings` to convert them."
+        )
+    if (headers['version'] != FORMAT_VERSION).any():
+        raise EmbeddingFormatError(f"Unsupported embedding format version(s): {sorted(set(headers['version']))}")
+
+    widths = np.unique(headers['n_features'])
+    if widths.size != 1 or (n_features is not None and widths[0] != n_features):
+        raise EmbeddingFormatError(f"Embedding vocabulary size {widths.tolist()} does not match vectorizer ({n_features}).")
+    if fingerprint is not None and (headers['fingerprint'] != fingerprint).any():
+        raise EmbeddingFormatError("Embeddings were generated by a different vectorizer. Re-run src/embeddings.py.")
+
+    nnz = headers['nnz'].astype(np.int64)
+    if (lengths != HEADER_SIZE + 8 * nnz).any():
+        raise EmbeddingFormatError("Embedding blob length does not match its header.")
+
+    indptr = np.zeros(len(blobs) + 1, dtype=np.int64)
+    np.cumsum(nnz, out=indptr[1:])
+    row_of = np.repeat(np.arange(len(blobs)), nnz)
+    position = np.arange(indptr[-1]) - indptr[row_of]
+    index_offsets = starts[row_of] + HEADER_SIZE + 4 * position
+    value_offsets = index_offsets + 4 * nnz[row_of]
+
+    indices = _gather(buf, index_offsets, '<i4')
+    data = _gather(buf, value_offsets, '<f4')
+    matrix = sp.csr_matrix((data, indices, indptr), shape=(len(blobs), int(widths[0])))
+    return np.array(ids, dtype=np.int64), matrix